@@ -0,0 +1,188 @@
+import pygame as pg
+from threading import Lock
+from config import debug_surfaces
+from profiler import profiler
+
+
+def surface_size(asset):
+	# approximate number of bytes an asset keeps in memory
+	if isinstance(asset, pg.Surface):
+		if asset.get_parent() is not None:
+			return 0  # subsurfaces share the pixels of their parent
+		return asset.get_width() * asset.get_height() * asset.get_bytesize()
+	if isinstance(asset, pg.mixer.Sound):
+		frequency, size, channels = pg.mixer.get_init() or (0, 0, 0)
+		return int(asset.get_length() * frequency * channels * abs(size) // 8)
+	if isinstance(asset, dict):
+		return sum(surface_size(value) for value in asset.values())
+	if isinstance(asset, (list, tuple)):
+		return sum(surface_size(value) for value in asset)
+	return 0
+
+
+def display_format(alpha):
+	# (bits per pixel, masks) of surfaces converted with convert_alpha or convert
+	reference = pg.Surface((1, 1), pg.SRCALPHA if alpha else 0)
+	reference = reference.convert_alpha() if alpha else reference.convert()
+	return reference.get_bitsize(), reference.get_masks()
+
+
+def in_display_format(surface):
+	alpha = bool(surface.get_flags() & pg.SRCALPHA)
+	return (surface.get_bitsize(), surface.get_masks()) == display_format(alpha)
+
+
+def is_opaque(surface):
+	if not surface.get_flags() & pg.SRCALPHA:
+		return True
+	# a mask is taken from the colorkey when there is one, so it is lifted while the alpha is read
+	colorkey = surface.get_colorkey()
+	surface.set_colorkey(None)
+	opaque = pg.mask.from_surface(surface, 254).count() == surface.get_width() * surface.get_height()
+	surface.set_colorkey(colorkey)
+	return opaque
+
+
+def normalize(surface, colorkey=None):
+	# makes a surface cheap to blit, once: opaque images (with or without a colorkey) become display-format
+	# surfaces with an rle colorkey, images with real per-pixel alpha keep it and get the colorkey folded into it.
+	# surfaces already in the right format are changed in place, everything else is copied
+	if colorkey is None:
+		colorkey = surface.get_colorkey()
+
+	if is_opaque(surface):
+		if surface.get_flags() & pg.SRCALPHA or not in_display_format(surface):
+			surface = surface.convert()
+		if colorkey is not None:
+			surface.set_colorkey(colorkey, pg.RLEACCEL)
+		return surface
+
+	if colorkey is None:
+		return surface if in_display_format(surface) else surface.convert_alpha()
+	image = surface.convert_alpha()
+	image.set_colorkey(None)
+	key_pixels = pg.mask.from_threshold(image, pg.Color(colorkey), (1, 1, 1, 255))
+	key_pixels.to_surface(image, setcolor=(0, 0, 0, 0), unsetcolor=None)
+	return image
+
+
+def is_normalized(surface):
+	# what normalize returns: display format, and a colorkey only with rle and without per-pixel alpha
+	if not in_display_format(surface):
+		return False
+	if surface.get_flags() & pg.SRCALPHA:
+		return surface.get_colorkey() is None
+	# RLEACCELOK is set with the colorkey, RLEACCEL only once the surface has been encoded by a blit
+	return surface.get_colorkey() is None or bool(surface.get_flags() & (pg.RLEACCELOK | pg.RLEACCEL))
+
+
+def check_surface(surface, where):
+	# called where surfaces reach the screen; with debug_surfaces on, one that skipped normalize fails loudly
+	if debug_surfaces:
+		assert is_normalized(surface), f'{where}: {surface} was not normalized'
+
+
+def check_blits(sequence, where):
+	# the same for (surface, pos, ...) blit sequences
+	if debug_surfaces:
+		for surface, *rest in sequence:
+			assert is_normalized(surface), f'{where}: {surface} at {rest[0]} was not normalized'
+
+
+def normalize_asset(asset):
+	# normalizes every surface of an asset; lists and dicts are updated in place
+	if isinstance(asset, pg.Surface):
+		return normalize(asset)
+	if isinstance(asset, list):
+		asset[:] = [normalize_asset(value) for value in asset]
+	elif isinstance(asset, dict):
+		for key, value in asset.items():
+			asset[key] = normalize_asset(value)
+	elif isinstance(asset, tuple):
+		return tuple(normalize_asset(value) for value in asset)
+	return asset
+
+
+class AssetRegistry:
+	def __init__(self):
+		self.assets = {}
+		self.hits = {}
+		self.misses = {}
+		self.lock = Lock()  # levels are loaded on a worker thread while the menu runs
+
+	def get(self, key, loader):
+		# return the asset stored under key; the loader is only called the first time and its surfaces are
+		# normalized before they are stored
+		with self.lock:
+			if key in self.assets:
+				self.hits[key] += 1
+				return self.assets[key]
+
+		# loading happens outside the lock so one slow asset doesn't block the other thread;
+		# if both threads load the same key, the first stored copy wins
+		asset = normalize_asset(loader())
+		with self.lock:
+			if key in self.assets:
+				self.hits[key] += 1
+				return self.assets[key]
+			self.assets[key] = asset
+			self.hits[key] = 0
+			self.misses[key] = 1
+		return asset
+
+	def load_image(self, path, alpha=True):
+		# decode an image without keeping it; converted to the display format with per-pixel alpha unless alpha is False
+		with profiler.phase(path, 'image'):
+			image = pg.image.load(path)
+			return image.convert_alpha() if alpha else image
+
+	def image(self, path, alpha=True):
+		return self.get(('image', path, alpha), lambda: self.load_image(path, alpha))
+
+	def sound(self, path):
+		return self.get(('sound', path), lambda: self.load_sound(path))
+
+	def load_sound(self, path):
+		with profiler.phase(path, 'sound'):
+			return pg.mixer.Sound(path)
+
+	def font(self, path, size):
+		return self.get(('font', path, size), lambda: self.load_font(path, size))
+
+	def load_font(self, path, size):
+		with profiler.phase(f'{path} {size}', 'font'):
+			return pg.font.Font(path, size)
+
+	def memory(self, key):
+		return surface_size(self.assets[key])
+
+	def stats(self):
+		# one entry per asset: key, hits, misses and memory in bytes
+		with self.lock:
+			keys = list(self.assets)
+		return [
+			{'key': key, 'hits': self.hits[key], 'misses': self.misses[key], 'bytes': self.memory(key)}
+			for key in keys
+		]
+
+	def report(self):
+		lines = []
+		for entry in sorted(self.stats(), key=lambda entry: entry['bytes'], reverse=True):
+			kind, path, *params = entry['key']
+			lines.append(f"{kind:<8}{entry['hits']:>7}{entry['misses']:>5}{entry['bytes'] / 1024:>10.1f} KB  {path} {params or ''}")
+
+		total = sum(entry['bytes'] for entry in self.stats())
+		hits = sum(self.hits.values())
+		misses = sum(self.misses.values())
+		lines.append(f'{len(self.assets)} assets, {hits} hits, {misses} misses, {total / 1024 / 1024:.1f} MB')
+		return '\n'.join(lines)
+
+	def clear(self):
+		with self.lock:
+			self.assets.clear()
+			self.hits.clear()
+			self.misses.clear()
+
+
+# every sprite sheet, image folder and sound is decoded once per process through this registry
+registry = AssetRegistry()
@@ -0,0 +1,112 @@
+import os
+import sys
+from os.path import basename, dirname, exists, isdir
+
+# offline tool, run from the project root: python data/code/atlas.py
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame as pg
+
+from game_data import folder_animations, spritesheet_animations, png_graphics, atlas_graphics
+from support import folder_files, atlas_header, atlas_frame, atlas_magic, atlas_version
+
+page_size = 2048
+
+
+def asset_paths(paths):
+	# flatten the nested game_data dicts into a list of image and folder paths
+	for path in paths.values():
+		if isinstance(path, dict):
+			yield from asset_paths(path)
+		else:
+			yield path
+
+
+def collect_assets():
+	# {asset path: [image files]} for every entry that exists on disk, in the order the game loads them
+	assets = {}
+	for table in (folder_animations, spritesheet_animations, png_graphics):
+		for path in asset_paths(table):
+			if path in assets:
+				continue
+			if path.endswith('/'):
+				if isdir(path):
+					assets[path] = folder_files(path)
+			elif exists(path):
+				assets[path] = [path]
+			else:
+				print(f'skipping missing asset {path}')
+
+	return assets
+
+
+def pack(sizes):
+	# shelf packing, tallest frames first; returns one (page, x, y) placement per size
+	placements = [None] * len(sizes)
+	page, x, y, shelf_height = 0, 0, 0, 0
+	for i in sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True):
+		width, height = sizes[i]
+		if width > page_size or height > page_size:
+			raise ValueError(f'frame of size {sizes[i]} does not fit on a {page_size}px atlas page')
+		if x + width > page_size:  # next shelf
+			x, y, shelf_height = 0, y + shelf_height, 0
+		if y + height > page_size:  # next page
+			page, x, y, shelf_height = page + 1, 0, 0, 0
+		placements[i] = (page, x, y)
+		x += width
+		shelf_height = max(shelf_height, height)
+
+	return placements
+
+
+def write_string(index_file, string):
+	data = string.encode('utf-8')
+	index_file.write(len(data).to_bytes(2, 'little'))
+	index_file.write(data)
+
+
+def build_atlas(index_path):
+	assets = collect_assets()
+	images = [pg.image.load(file).convert_alpha() for files in assets.values() for file in files]
+	placements = pack([image.get_size() for image in images])
+
+	# pages are only as tall as their lowest frame
+	page_count = max(page for page, x, y in placements) + 1
+	page_heights = [0] * page_count
+	for image, (page, x, y) in zip(images, placements):
+		page_heights[page] = max(page_heights[page], y + image.get_height())
+
+	pages = [pg.Surface((page_size, height), flags=pg.SRCALPHA) for height in page_heights]
+	for image, (page, x, y) in zip(images, placements):
+		pages[page].blit(image, (x, y), special_flags=pg.BLEND_RGBA_MAX)  # exact copy, alpha included
+
+	name = basename(index_path).rsplit('.', 1)[0]
+	page_names = [f'{name}_{page}.png' for page in range(page_count)]
+	os.makedirs(dirname(index_path), exist_ok=True)
+	for page, page_name in zip(pages, page_names):
+		pg.image.save(page, os.path.join(dirname(index_path), page_name))
+
+	with open(index_path, 'wb') as index_file:
+		index_file.write(atlas_header.pack(atlas_magic, atlas_version, page_count, len(assets)))
+		for page_name in page_names:
+			write_string(index_file, page_name)
+
+		frame = 0
+		for path, files in assets.items():
+			write_string(index_file, path)
+			index_file.write(len(files).to_bytes(2, 'little'))
+			for _ in files:
+				image, (page, x, y) = images[frame], placements[frame]
+				width, height = image.get_size()
+				# pivot is the frame center; duration 0 means the sprite's own animation speed is used
+				index_file.write(atlas_frame.pack(page, x, y, width, height, width // 2, height // 2, 0))
+				frame += 1
+
+	print(f'packed {len(images)} frames from {len(assets)} assets into {page_count} pages -> {index_path}')
+
+
+if __name__ == '__main__':
+	pg.init()
+	pg.display.set_mode((1, 1))
+	build_atlas(sys.argv[1] if len(sys.argv) > 1 else atlas_graphics['index'])
+	pg.quit()
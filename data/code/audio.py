@@ -0,0 +1,78 @@
+import pygame as pg
+from assets import registry
+from config import mixer_frequency, mixer_buffer, channel_groups
+from game_data import sounds
+
+
+def init_mixer():
+	# has to be called before pg.init()
+	pg.mixer.pre_init(mixer_frequency, -16, 2, mixer_buffer)
+
+
+class SoundBank:
+	def __init__(self, sounds, channel_groups):
+		self.sounds = sounds
+		self.channel_groups = channel_groups
+		self.groups = {}  # category: reserved channels
+		self.voices = {}  # sound name: channels it was played on, oldest first
+		self.start_times = {}  # channel: when it started its current sound
+
+		self.sounds_on = True
+		self.music_on = True
+
+	def setup_channels(self):
+		# every channel belongs to one category, so a burst of enemy sounds can't take the music's channel
+		total = sum(self.channel_groups.values())
+		pg.mixer.set_num_channels(total)
+		pg.mixer.set_reserved(total)
+		first = 0
+		for category, count in self.channel_groups.items():
+			self.groups[category] = [pg.mixer.Channel(i) for i in range(first, first + count)]
+			first += count
+
+	def load(self, categories=None):
+		# decodes the sounds of the given categories up front, every sound if None; decoded ones are kept
+		for path, category, *_ in self.sounds.values():
+			if categories is None or category in categories:
+				registry.sound(path)
+
+	def is_on(self, category):
+		return self.music_on if category == 'music' else self.sounds_on
+
+	def free_channel(self, category):
+		channels = self.groups[category]
+		for channel in channels:
+			if not channel.get_busy():
+				return channel
+		# every channel of the category is busy: take over the one that has been playing the longest
+		return min(channels, key=lambda channel: self.start_times.get(channel, 0))
+
+	def play(self, name, loops=0):
+		path, category, volume, max_voices = self.sounds[name]
+		if not self.is_on(category):
+			return None
+		if not self.groups:
+			self.setup_channels()
+
+		sound = registry.sound(path)
+		voices = [channel for channel in self.voices.get(name, []) if channel.get_sound() is sound]
+		if len(voices) >= max_voices:
+			channel = voices.pop(0)  # restart the oldest voice instead of stacking another one
+		else:
+			channel = self.free_channel(category)
+
+		channel.play(sound, loops)
+		channel.set_volume(volume)
+		self.start_times[channel] = pg.time.get_ticks()
+		self.voices[name] = voices + [channel]
+		return channel
+
+	def stop(self, name):
+		sound = registry.sound(self.sounds[name][0])
+		for channel in self.voices.pop(name, []):
+			if channel.get_sound() is sound:
+				channel.stop()
+
+
+# the only place sounds are played from; sounds_on and music_on are checked here
+sound_bank = SoundBank(sounds, channel_groups)
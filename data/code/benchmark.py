@@ -0,0 +1,117 @@
+import os
+import sys
+from time import perf_counter
+
+# run from the project root like main.py: python data/code/benchmark.py player
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame as pg
+
+
+def measure(function, repeats):
+	# average time of a single call in microseconds
+	start = perf_counter()
+	for _ in range(repeats):
+		function()
+	return (perf_counter() - start) / repeats * 1_000_000
+
+
+def bench_player(repeats=2000):
+	# per-frame cost of picking the player image: flipping and converting every tick vs indexing baked frames
+	from config import player_full_size
+	from player import Player
+
+	player = Player((400, 400), player_full_size, lambda *args: None)
+	player.state = 'run'
+	player.facing_left = True
+	frames = player.animation_set[player.state]
+
+	def before():
+		player.frame_index = (player.frame_index + 0.3) % len(frames)
+		image = frames[int(player.frame_index)]
+		player.image = pg.transform.flip(image, player.facing_left, False).convert_alpha()
+
+	def after():
+		player.frame_index = (player.frame_index + 0.3) % len(frames)
+		player.animate(0)
+
+	before_time = measure(before, repeats)
+	after_time = measure(after, repeats)
+	print(f'player frame  before: {before_time:8.2f} us  after: {after_time:8.2f} us  ({before_time / after_time:.0f}x)')
+
+
+restart_target_ms = 5
+
+
+def bench_restart(repeats=20):
+	# restarting used to build a new Level; now the existing one is reset from its spawn snapshot
+	from button import Button
+	from level import Level
+
+	screen = pg.display.get_surface()
+	level = Level(screen, Button('pause', (100, 100)), 100)
+
+	rebuild_time = measure(lambda: Level(screen, level.pause_btn, 100), repeats) / 1000
+	reset_time = measure(lambda: level.reset(100), repeats) / 1000
+	verdict = 'ok' if reset_time <= restart_target_ms else 'over target'
+	print(f'level restart  rebuild: {rebuild_time:8.2f} ms  reset: {reset_time:8.2f} ms  (target {restart_target_ms} ms, {verdict})')
+
+
+def bench_blocks(repeats=200):
+	# drawing the block layer: one blit per brick vs the pre-rendered chunks that overlap the screen. the brick
+	# surfaces are normalized when they are registered, so the per-brick blits are already fast and the chunks
+	# mostly save the blit calls
+	from button import Button
+	from level import Level
+
+	screen = pg.display.get_surface()
+	level = Level(screen, Button('pause', (100, 100)), 100)
+
+	sprites_time = measure(lambda: level.block_sprites.draw(screen), repeats)
+	def chunks():
+		level.block_map.draw(level.render_queue, 'blocks', level.camera.offset())
+		level.render_queue.flush()
+
+	chunks_time = measure(chunks, repeats)
+	print(f'block layer  sprites: {sprites_time:8.2f} us  chunks: {chunks_time:8.2f} us  ({sprites_time / chunks_time:.1f}x)')
+
+
+def bench_particles(frames=120):
+	# a frame of lava splash particles (drawn, moved and culled) for a growing number of particles
+	import numpy as np
+	from particles import ParticleSystem
+	from render import RenderQueue
+
+	screen = pg.display.get_surface()
+	for count in (200, 2000, 10000):
+		particles = ParticleSystem(screen)
+		particles.rng = np.random.default_rng(0)
+		for _ in range(count // 200):
+			particles.splash((640, 600))
+		queue = RenderQueue(screen, ('effects',))
+
+		def frame():
+			particles.draw(queue, 'effects', (0, 0))
+			queue.flush()
+			particles.update()
+
+		frame_time = measure(frame, frames) / 1000
+		print(f'particles {count:6}  frame: {frame_time:8.2f} ms  ({count} emitted, {particles.count} left after {frames} frames)')
+
+
+benchmarks = {
+	'player': bench_player,
+	'restart': bench_restart,
+	'blocks': bench_blocks,
+	'particles': bench_particles,
+}
+
+if __name__ == '__main__':
+	pg.init()
+	screen = pg.display.set_mode((1280, 720))
+	print(f'pygame {pg.version.ver}, SDL {".".join(map(str, pg.get_sdl_version()))}, python {sys.version.split()[0]}, '
+		f'{screen.get_width()}x{screen.get_height()} {os.environ["SDL_VIDEODRIVER"]} display')
+	for name in sys.argv[1:] or benchmarks:
+		benchmarks[name]()
+	pg.quit()
@@ -1,36 +1,35 @@
 import pygame as pg
-from game_data import button_images, audio_paths
+from game_data import button_images
+from assets import registry, normalize, check_blits
+from audio import sound_bank
 
-class Button(pg.sprite.Sprite):
+class Button(pg.sprite.DirtySprite):
 	def __init__(self, name, size):
 		super().__init__()
-		normal_image = pg.image.load(button_images[name][0]).convert_alpha()
-		hovered_image = pg.image.load(button_images[name][1]).convert_alpha()
+		normal_image = registry.image(button_images[name][0])
+		hovered_image = registry.image(button_images[name][1])
 
-		self.hovered_image = pg.transform.scale(hovered_image, size)
-		self.normal_image = pg.transform.scale(normal_image, size)
+		self.hovered_image = normalize(pg.transform.scale(hovered_image, size), 'white')
+		self.normal_image = normalize(pg.transform.scale(normal_image, size), 'white')
 
-		self.image_rect = self.normal_image.get_rect()
-
-		self.image = pg.Surface(self.image_rect.size, flags=pg.SRCALPHA)
-		self.image.set_colorkey('white')
+		self.image = self.normal_image
 		self.rect = self.image.get_rect()
 
 		self.hovered = False
 		self.pressed = False
 
-		self.click = pg.mixer.Sound(audio_paths['button'])
-		self.click.set_volume(0.5)
-
 	def check_hover(self, mouse_pos):
-		if (self.rect.left <= mouse_pos[0] <= self.rect.right) and (self.rect.top <= mouse_pos[1] <= self.rect.bottom):
-			self.hovered = True
-			self.image.blit(self.hovered_image, (0, 0))
-		else:
-			self.hovered = False
-			self.image.blit(self.normal_image, (0, 0))
+		hovered = (self.rect.left <= mouse_pos[0] <= self.rect.right) and (self.rect.top <= mouse_pos[1] <= self.rect.bottom)
+		if hovered != self.hovered:
+			self.hovered = hovered
+			self.show()
+
+	def show(self):
+		# the image only changes with the hover state; dirty makes the button group redraw it once
+		self.image = self.hovered_image if self.hovered else self.normal_image
+		self.dirty = 1
 
-	def update(self, mouse_down, mouse_position, sounds_on):
+	def update(self, mouse_down, mouse_position):
 		self.check_hover(mouse_position)
 		if self.hovered and mouse_down:
 			self.pressed = True
@@ -42,28 +41,40 @@ class AudioButton(Button):
 	def __init__(self, name, size, is_audio_on):
 		super().__init__(name, size)
 		name = name.replace('on', 'off')
-		self.image_off = pg.transform.scale(pg.image.load(button_images[name][0]).convert_alpha(), size)
-		self.image_off_hovered = pg.transform.scale(pg.image.load(button_images[name][1]).convert_alpha(), size)
+		self.image_off = normalize(pg.transform.scale(registry.image(button_images[name][0]), size), 'white')
+		self.image_off_hovered = normalize(pg.transform.scale(registry.image(button_images[name][1]), size), 'white')
 		self.audio_on = True
 
 		if not is_audio_on:
-			self.toggle_audio(False)
+			self.toggle_audio(click=False)
 
-	def toggle_audio(self, sounds_on):
-		if sounds_on:
-			self.click.play()
+	def toggle_audio(self, click=True):
+		if click:
+			sound_bank.play('button')
 		self.audio_on = not self.audio_on
 		self.image_off, self.normal_image = self.normal_image, self.image_off
 		self.image_off_hovered, self.hovered_image = self.hovered_image, self.image_off_hovered
+		self.show()
 
 
-class ButtonGroup(pg.sprite.Group):
+class ButtonGroup(pg.sprite.LayeredDirty):
 	def __init__(self, buttons, display_size):
 		self.WIDTH = display_size[0]
 		self.HEIGHT = display_size[1]
 		super().__init__(buttons)
 		self.place_buttons()
 
+	def redraw(self, surface, background):
+		# draws every button over a freshly drawn screen; background is what the screen shows under them
+		self.clear(surface, background)
+		for button in self.buttons:
+			button.dirty = 1
+		self.draw(surface)
+
+	def draw(self, surface, *args, **kwargs):
+		check_blits(((button.image, button.rect) for button in self.buttons), 'buttons')
+		return super().draw(surface, *args, **kwargs)
+
 	def place_buttons(self):
 		y = self.HEIGHT * 3 / 4
 		current_x = self.WIDTH / (len(self.buttons) + 1)
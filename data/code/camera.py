@@ -0,0 +1,32 @@
+import pygame as pg
+
+
+class Camera:
+	def __init__(self, view_size):
+		# everything in the level keeps world coordinates; the camera offset is only added when drawing
+		self.view_size = view_size
+		self.pos = pg.math.Vector2()  # world position of the screen's top left corner
+		self.rounded = pg.Rect(0, 0, 0, 0)
+
+	def reset(self):
+		self.pos.update(0, 0)
+
+	def scroll(self, shift):
+		# the world moves by shift on screen, so the camera moves the other way
+		self.pos.x -= shift[0]
+		self.pos.y -= shift[1]
+
+	def offset(self, parallax=1):
+		# added to a world position to get its screen position, for a layer that moves at parallax speed.
+		# rounded like a sprite rect so layers and sprites line up
+		self.rounded.topleft = -self.pos * parallax
+		return self.rounded.topleft
+
+	def to_screen(self, pos, parallax=1):
+		x, y = self.offset(parallax)
+		return pos[0] + x, pos[1] + y
+
+	def view(self, parallax=1):
+		# the screen rect in the world coordinates of a layer
+		x, y = self.offset(parallax)
+		return pg.Rect((-x, -y), self.view_size)
@@ -6,3 +6,36 @@ player_real_size = (54, 90)  # borders of the character inside that frame  (RESI
 
 FPS = 60
 TARGET_FPS = 60
+
+# audio: a small mixer buffer keeps the delay between an action and its sound low
+mixer_frequency = 44100
+mixer_buffer = 256  # samples; raise it if the sound crackles
+channel_groups = {'music': 2, 'ui': 2, 'world': 4, 'player': 5, 'enemy': 8}  # channels reserved per category
+
+# levels are split into chunks of this many tiles (columns, rows) for streaming and culling
+level_chunk_size = (16, 16)
+
+# rendered strings kept by the text cache before the least recently used ones are dropped
+text_cache_size = 256
+
+# sprites further than this many pixels outside the screen are not drawn (or animated, where that is safe)
+cull_margin = 90
+
+# particles are kept in arrays of this size, doubled when a burst needs more room
+particle_capacity = 1024
+
+# shockwave rings are drawn once per (radius, thickness, color) and cached up to this many bytes;
+# wider rings are drawn every frame
+ring_cache_bytes = 16 * 1024 * 1024
+ring_cache_max_radius = 160
+# smooth ring edges; they are blended with per-pixel alpha, which is slower to blit than the plain colorkey
+shockwave_antialias = False
+
+# checks that every surface reaching the level's render queue went through assets.normalize (slow, for debugging)
+debug_surfaces = False
+
+# the game is drawn at this logical resolution and scaled to the screen once per frame, which keeps the fill rate
+# the same on big displays; None draws straight to the screen at its own resolution
+render_resolution = None  # e.g. (1920, 1080)
+# 'integer' scales by whole multiples and letterboxes the rest (sharp pixels), 'smooth' fills the screen filtered
+render_scaling = 'integer'
@@ -0,0 +1,44 @@
+import pygame as pg
+from config import cull_margin
+
+
+class Culler:
+	def __init__(self, view_size, margin=cull_margin):
+		# the screen rect plus a margin; sprites are in world coordinates and checked against it moved by the camera
+		self.view = pg.Rect((0, 0), view_size).inflate(margin * 2, margin * 2)
+		self.counts = {}  # group or layer name: (drawn, culled) this frame
+		self.drawn = 0
+		self.culled = 0
+
+	def start(self):
+		# called at the start of every frame
+		self.counts.clear()
+		self.drawn = 0
+		self.culled = 0
+
+	def count(self, name, drawn, culled):
+		self.counts[name] = (drawn, culled)
+		self.drawn += drawn
+		self.culled += culled
+
+	def world_view(self, offset):
+		# the view in the world coordinates of a layer drawn with this camera offset
+		return self.view.move(-offset[0], -offset[1])
+
+	def update(self, group, dt, offset):
+		# sprites that may skip their animation while off screen (cull_animation) get dt 0
+		view = self.world_view(offset)
+		for sprite in group.sprites():
+			sprite.update(dt if not sprite.cull_animation or sprite.rect.colliderect(view) else 0)
+
+	def draw(self, group, queue, layer, offset):
+		# submits the sprites near the screen to a layer of the render queue
+		view = self.world_view(offset)
+		sprites = group.sprites()
+		visible = [(sprite.image, sprite.rect.move(offset)) for sprite in sprites if sprite.rect.colliderect(view)]
+		queue.submit_many(layer, visible)
+		self.count(layer, len(visible), len(sprites) - len(visible))
+
+	def skip(self, group, name):
+		# groups that are never drawn, like the invisible borders
+		self.count(name, 0, len(group))
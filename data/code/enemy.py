@@ -1,14 +1,17 @@
-from game_data import folder_animations, audio_paths
+from game_data import folder_animations
 from random import randint
 import pygame as pg
-from support import import_folder
+from support import import_folder, flip_frames
+from assets import registry
+from audio import sound_bank
 
 
 class Enemy(pg.sprite.Sprite):
 	def __init__(self, name, pos, size):
 		super().__init__()
 		# animation info
-		self.animation_set = self.get_animations(folder_animations[name])
+		self.scale = (350, 350)
+		self.animation_set, self.flipped_animation_set = self.get_animations(name)
 		self.frame_index = 0
 		self.animation_speed = 12
 		self.attack_animation_speed = 22
@@ -17,11 +20,10 @@ class Enemy(pg.sprite.Sprite):
 		self.state = 'run'
 		self.name = name
 		# geometry
-		self.scale = (350, 350)
 		self.size = size
 		self.pos = pos
 		# rects
-		self.image = self.animation_set[self.state][self.frame_index].convert_alpha()
+		self.image = self.animation_set[self.state][self.frame_index]
 		self.rect = self.image.get_rect(center=pos)
 		self.innerbox = pg.Rect(*pos, *size)
 		self.innerbox.center = pos
@@ -44,16 +46,18 @@ class Enemy(pg.sprite.Sprite):
 		self.invincibility_duration = 1000
 		self.hurt_time = 0
 		self.is_killed = False
-		# sounds
-		self.death_sound = pg.mixer.Sound(audio_paths['enemy']['death'])
-		self.hit_sound = pg.mixer.Sound(audio_paths['enemy']['hit'])
 
-	def get_animations(self, set):
+	def get_animations(self, name):
+		# frames are baked once per enemy type: scaled, converted and flipped for both directions
+		return registry.get(('enemy', name, self.scale), lambda: self.bake_animations(folder_animations[name]))
+
+	def bake_animations(self, set):
 		surface_list = {}
+		flipped_surface_list = {}
 		for anim in set.keys():
 			path = set[anim]
-			surface_list[anim] = import_folder(path)
-		return surface_list
+			surface_list[anim], flipped_surface_list[anim] = flip_frames(import_folder(path), self.scale, (255, 255, 255))
+		return surface_list, flipped_surface_list
 
 	def increase_frame_index(self, dt):
 		# the animation speed differs depending on the current state
@@ -77,9 +81,8 @@ class Enemy(pg.sprite.Sprite):
 				self.state = 'run'
 				self.direction_x = -1 if self.facing_left else 1
 
-		self.image = self.animation_set[self.state][int(self.frame_index)].convert_alpha()
-		if self.facing_left:
-			self.image = pg.transform.flip(self.image, True, False)
+		animation_set = self.flipped_animation_set if self.facing_left else self.animation_set
+		self.image = animation_set[self.state][int(self.frame_index)]
 
 	def limit(self, borders):
 		for border in borders:
@@ -98,15 +101,14 @@ class Enemy(pg.sprite.Sprite):
 	def move(self, dt):
 		self.pos.x += self.direction_x * self.speed_x * dt
 
-	def get_damage(self, damage, sounds_on):
+	def get_damage(self, damage):
 		self.state = 'take hit'
 		self.invincible = True
 		self.direction_x = 0
 		self.frame_index = 0
 		self.health -= damage
 		self.hurt_time = pg.time.get_ticks()
-		if sounds_on:
-			self.hit_sound.play()
+		sound_bank.play('enemy hit')
 
 	def invincibility_timer(self):
 		if self.invincible:
@@ -122,22 +124,16 @@ class Enemy(pg.sprite.Sprite):
 			self.attackbox.right = self.innerbox.centerx + 5
 		else:
 			self.attackbox.left = self.innerbox.centerx - 5
-		self.image.set_colorkey((255, 255, 255))
 
-	def attack(self, sounds_on):
+	def attack(self):
 		if self.state == 'attack': return
-		if sounds_on:
-			self.attack_sound.play()
+		sound_bank.play(f'{self.name} attack')
 		self.state = 'attack'
 		self.direction_x = 0
 		self.frame_index = 0
 
-	def update(self, shift, borders, dt):
-		self.pos.x += shift[0]
-		self.pos.y += shift[1]
-
+	def update(self, borders, dt):
 		self.animate(dt)
-		self.image = pg.transform.scale(self.image, self.scale).convert_alpha()
 		self.old_rect = self.innerbox.copy()
 		self.rect = self.image.get_rect(center=self.innerbox.center)
 		self.move(dt)
@@ -158,9 +154,6 @@ class Eye(Enemy):
 		self.direction_y = 0
 		self.fallen = False
 
-		attack_sound_path = audio_paths['enemy']['attack']['eye']
-		self.attack_sound = pg.mixer.Sound(attack_sound_path)
-
 	def apply_gravity(self, dt):
 		if self.fallen:
 			self.direction_x = 0
@@ -181,7 +174,6 @@ class Eye(Enemy):
 			self.attackbox.right = self.innerbox.centerx + 5
 		else:
 			self.attackbox.left = self.innerbox.centerx - 5
-		self.image.set_colorkey((255, 255, 255))
 
 
 class Goblin(Enemy):
@@ -193,9 +185,6 @@ class Goblin(Enemy):
 		self.attackbox_size = (75, 70)
 		self.attackbox = pg.Rect(0, 0, *self.attackbox_size)
 
-		attack_sound_path = audio_paths['enemy']['attack']['goblin']
-		self.attack_sound = pg.mixer.Sound(attack_sound_path)
-
 
 class Mushroom(Enemy):
 	def __init__(self, pos):
@@ -206,9 +195,6 @@ class Mushroom(Enemy):
 		self.attackbox_size = (75, 70)
 		self.attackbox = pg.Rect(0, 0, *self.attackbox_size)
 
-		attack_sound_path = audio_paths['enemy']['attack']['eye']
-		self.attack_sound = pg.mixer.Sound(attack_sound_path)
-
 
 class Skeleton(Enemy):
 	def __init__(self, pos):
@@ -218,6 +204,3 @@ class Skeleton(Enemy):
 		self.health = 60
 		self.attackbox_size = (100, 110)
 		self.attackbox = pg.Rect(0, 0, *self.attackbox_size)
-
-		attack_sound_path = audio_paths['enemy']['attack']['skeleton']
-		self.attack_sound = pg.mixer.Sound(attack_sound_path)
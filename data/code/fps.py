@@ -1,7 +1,8 @@
 import pygame as pg
+from assets import registry
+from text import text_cache
 
 def draw_fps(screen, pos, clock):
 	fps = round(clock.get_fps())
-	font = pg.font.SysFont('Arial', 30)
-	fps_surface = font.render(f'fps: {str(fps)}', True, 'white')
-	screen.blit(fps_surface, pos)
+	font = registry.get(('sysfont', 'Arial', 30), lambda: pg.font.SysFont('Arial', 30))
+	text_cache.atlas(font, 'white', True, 'fps: 0123456789').draw(screen, f'fps: {str(fps)}', pos)
@@ -1,33 +1,39 @@
 import pygame as pg
 
+from assets import registry, check_surface
+from audio import sound_bank
 from button import Button, MenuButtonGroup, PauseButtonGroup, GameoverButtonGroup, SettingsButtonGroup
 from config import tile_size
-from game_data import audio_paths, png_graphics
-from level import Level
+from game_data import png_graphics
+from loader import LevelLoader
+from support import import_image
 from tiles import StaticTile
 from ui import UI, TextLabel
 
 
 class Game:
+	font_path = 'data/assets/ui/ARCADEPI.TTF'
+
 	def __init__(self, screen, state):
 		# settings
 		self.display_surface = screen
 		self.WIDTH = screen.get_width()
 		self.HEIGHT = screen.get_height()
-		# fonts
-		self.author_font = pg.font.Font('data/assets/ui/ARCADEPI.TTF', 30)
-		self.small_font = pg.font.Font('data/assets/ui/ARCADEPI.TTF', 35)
-		self.normal_font = pg.font.Font('data/assets/ui/ARCADEPI.TTF', 50)
-		self.midium_font = pg.font.Font('data/assets/ui/ARCADEPI.TTF', 60)
-		self.big_font = pg.font.Font('data/assets/ui/ARCADEPI.TTF', 70)
+		# fonts; the hud ones (small and midium) are only loaded with the hud
+		self.author_font = registry.font(self.font_path, 30)
+		self.normal_font = registry.font(self.font_path, 50)
+		self.big_font = registry.font(self.font_path, 70)
 		# level
 		self.state = state  # menu/game/pause/gameover/settings
 		self.prev_state = state
 		self.pause_btn = Button('pause', (100, 100))
 		self.health = 100
-		self.level = Level(screen, self.pause_btn, self.health)
+		# the level is built in the background once the menu is up; open_level waits for it only if it isn't ready yet
+		self.level_loader = LevelLoader()
+		self.level_future = None
+		self.level = None
 		self.coins = 0
-		self.ui = UI(screen, self.health, self.midium_font, self.small_font)
+		self.ui = None
 		self.running = True
 		self.open_level_time = 0
 		self.last_button_press = 0
@@ -36,69 +42,96 @@ class Game:
 		self.author_label = TextLabel('Made By Lev Aronov', self.author_font, (0, 0))
 		self.author_label.rect.bottomright = (self.WIDTH - 50, self.HEIGHT - 50)
 		self.start_label = TextLabel('Enjoy the game!', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2))
+		self.loading_label = TextLabel('Loading...', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2))
 		self.pause_label = TextLabel('Game paused', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2))
 		self.lose_label = TextLabel('YOU LOST!', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2 - 50))
 		self.win_label = TextLabel('YOU WON!', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2 - 50))
 		self.score_label = TextLabel('Coins: ', self.normal_font, (self.WIDTH / 2, self.HEIGHT / 2 + 50))
-		# audio & buttons
-		self.music_on = True
-		self.sounds_on = True
-		self.button_click = pg.mixer.Sound(audio_paths['button'])
-		self.button_click.set_volume(0.5)
+		# audio & buttons; only the menu's sounds are decoded here, the loader decodes the rest with the level
+		sound_bank.load(('ui',))
 		self.create_buttons()
-		# background
-		self.create_background()
+		# background; composed with the title on first use and again only when the screen size changes
+		self.backdrop = None
+		self.drawn_state = None  # the menu screen that is currently on the display, None if it needs a full redraw
 
 	def create_buttons(self):
 		# all buttons except pause are created in each of these classes separately
 		self.menu_buttons = MenuButtonGroup([self.WIDTH, self.HEIGHT])
 		self.pause_buttons = PauseButtonGroup([self.WIDTH, self.HEIGHT])
 		self.gameover_buttons = GameoverButtonGroup([self.WIDTH, self.HEIGHT])
-		self.settings_buttons = SettingsButtonGroup([self.WIDTH, self.HEIGHT], self.music_on, self.sounds_on)
+		self.settings_buttons = SettingsButtonGroup([self.WIDTH, self.HEIGHT], sound_bank.music_on, sound_bank.sounds_on)
 
-	def create_background(self):
-		# create a brick tile spritegroup and fill up the entire screen with them
-		self.background = pg.Surface((self.WIDTH, self.HEIGHT))
-		self.bg_tiles_sprites = pg.sprite.Group()
-		tile_surface = pg.image.load(png_graphics['brick']).convert_alpha()
+	def create_backdrop(self):
+		# brick tiles filling up the entire screen, a bit of shading and the title labels on one surface
+		width, height = self.display_surface.get_size()
+		backdrop = pg.Surface((width, height)).convert()
+		tile_surface = import_image(png_graphics['brick'])
 
-		y_offset = self.HEIGHT - len(range(0, self.HEIGHT // tile_size[0] + 1)) * tile_size[1]
-		for y in range(self.HEIGHT // tile_size[0] + 1):
+		bg_tiles_sprites = pg.sprite.Group()
+		y_offset = height - len(range(0, height // tile_size[0] + 1)) * tile_size[1]
+		for y in range(height // tile_size[0] + 1):
 			y = y * tile_size[1] + y_offset
-			for x in range(self.WIDTH // tile_size[1] + 1):
+			for x in range(width // tile_size[1] + 1):
 				x *= tile_size[0]
 				sprite = StaticTile((x, y), tile_size, tile_surface)
-				self.bg_tiles_sprites.add(sprite)
+				bg_tiles_sprites.add(sprite)
+		bg_tiles_sprites.draw(backdrop)
 
-	def display_bg(self):
-		# draw background with a bit of shading
-		self.bg_tiles_sprites.draw(self.background)
-		self.display_surface.blit(self.background, (0, 0))
 		# add shading
-		surface = pg.Surface((self.WIDTH, self.HEIGHT))
-		surface.fill('black')
-		surface.set_alpha(50)
-		self.display_surface.blit(surface, (0, 0))
+		shade = pg.Surface((width, height))
+		shade.fill('black')
+		shade.set_alpha(50)
+		backdrop.blit(shade, (0, 0))
+
 		# add title label
-		self.display_surface.blit(self.title.image, self.title.rect)
-		self.display_surface.blit(self.author_label.image, self.author_label.rect)
+		self.title.rect.center = (width / 2, height / 4)
+		self.author_label.rect.bottomright = (width - 50, height - 50)
+		backdrop.blit(self.title.image, self.title.rect)
+		backdrop.blit(self.author_label.image, self.author_label.rect)
+		return backdrop
+
+	def draw_screen(self, buttons, labels):
+		# menus are static: the backdrop and labels are only drawn when the screen is entered and afterwards
+		# just the buttons whose hover state changed; returns the rects to update, None for the whole screen
+		if self.drawn_state == self.state:
+			return buttons.draw(self.display_surface)
+
+		self.display_bg()
+		for label in labels:
+			check_surface(label.image, 'label')
+			self.display_surface.blit(label.image, label.rect)
+		buttons.redraw(self.display_surface, self.display_surface.copy())
+		self.drawn_state = self.state
+		return None
+
+	def redraw(self):
+		# the whole screen is drawn again on the next frame, e.g. after the window was covered
+		self.drawn_state = None
+
+	def display_bg(self):
+		# draw the cached background, rebuilt only for a new screen size
+		if self.backdrop is None or self.backdrop.get_size() != self.display_surface.get_size():
+			self.backdrop = self.create_backdrop()
+		check_surface(self.backdrop, 'backdrop')
+		self.display_surface.blit(self.backdrop, (0, 0))
 
 	# region game stages methods
 	def play(self, dt, keys, mouse_down, mouse_pos):
 		# main game mode
+		self.drawn_state = None  # the level covers the whole screen
 		mouse_down = mouse_down and pg.time.get_ticks() - self.open_level_time > 50  # mouse down only 0.05s after opening the level
-		self.level.run(dt, self.health, keys, mouse_down, mouse_pos, self.sounds_on)
+		self.level.run(dt, self.health, keys, mouse_down, mouse_pos)
 
 		player = self.level.player.sprite
 		if self.level.paused:
 			self.state = 'pause'
-			self.level.level_music.stop()
-			self.level.torch_sound.stop()
+			sound_bank.stop('level bg')
+			sound_bank.stop('torch')
 			return
 
 		if self.level.gained_health != 0:
 			# when some health was gained
-			collide_pos = self.level.player.sprite.collisionbox.center
+			collide_pos = self.level.camera.to_screen(self.level.player.sprite.collisionbox.center)
 			self.ui.create_indicator(collide_pos, self.level.gained_health)  # shows an indicator when health is gained
 
 		# update coin and health information
@@ -114,26 +147,23 @@ class Game:
 		self.ui.draw(self.coins, self.health, dt)
 
 		if self.level.gameover:
-			self.level.level_music.stop()
-			self.level.torch_sound.stop()
-			if self.music_on:
-				if self.level.completed:
-					self.level.level_complete_music.play()
-				elif self.level.failed:
-					self.level.level_failed_music.play()
+			sound_bank.stop('level bg')
+			sound_bank.stop('torch')
+			if self.level.completed:
+				sound_bank.play('level complete')
+			elif self.level.failed:
+				sound_bank.play('level fail')
 			self.state = 'gameover'
 			self.score_label.update_text(self.score_label.text + str(self.coins))
 
 	def menu(self, mouse_down, mouse_pos):
-		self.display_bg()
+		self.menu_buttons.update(mouse_down, mouse_pos)
+		rects = self.draw_screen(self.menu_buttons, [self.start_label])
 
-		self.display_surface.blit(self.start_label.image, self.start_label.rect)
-
-		self.menu_buttons.update(mouse_down, mouse_pos, self.sounds_on)
-		self.menu_buttons.draw(self.display_surface)
+		self.load_level()  # the menu frame is drawn, so the level can start building
 
 		if pg.time.get_ticks() - self.last_button_press < 100:
-			return
+			return rects
 
 		if self.menu_buttons.start_btn.pressed:
 			self.open_level()
@@ -141,17 +171,14 @@ class Game:
 			self.goto_settings()
 		if self.menu_buttons.quit_btn.pressed:
 			self.quit()
+		return rects
 
 	def pause(self, mouse_down, mouse_pos):
-		self.display_bg()
-
-		self.display_surface.blit(self.pause_label.image, self.pause_label.rect)
-
-		self.pause_buttons.update(mouse_down, mouse_pos, self.sounds_on)
-		self.pause_buttons.draw(self.display_surface)
+		self.pause_buttons.update(mouse_down, mouse_pos)
+		rects = self.draw_screen(self.pause_buttons, [self.pause_label])
 
 		if pg.time.get_ticks() - self.last_button_press < 100:
-			return
+			return rects
 
 		if self.pause_buttons.start_btn.pressed:
 			self.level.paused = False
@@ -162,45 +189,59 @@ class Game:
 			self.goto_settings()
 		if self.pause_buttons.quit_btn.pressed:
 			self.quit()
+		return rects
 
 	def settings(self, mouse_down, mouse_pos):
-		self.display_bg()
-
-		self.settings_buttons.update(mouse_down, mouse_pos, self.sounds_on)
-		self.settings_buttons.draw(self.display_surface)
+		self.settings_buttons.update(mouse_down, mouse_pos)
+		rects = self.draw_screen(self.settings_buttons, [])
 
 		if pg.time.get_ticks() - self.last_button_press < 100:
-			return
+			return rects
 
 		if self.settings_buttons.sound_btn.pressed:
-			self.settings_buttons.sound_btn.toggle_audio(self.sounds_on)
-			self.sounds_on = self.settings_buttons.sound_btn.audio_on
+			self.settings_buttons.sound_btn.toggle_audio()
+			sound_bank.sounds_on = self.settings_buttons.sound_btn.audio_on
 
 		if self.settings_buttons.music_btn.pressed:
-			self.settings_buttons.music_btn.toggle_audio(self.sounds_on)
-			self.music_on = self.settings_buttons.music_btn.audio_on
+			self.settings_buttons.music_btn.toggle_audio()
+			sound_bank.music_on = self.settings_buttons.music_btn.audio_on
 
 		if self.settings_buttons.back_btn.pressed:
 			self.state = self.prev_state
 			self.last_button_press = pg.time.get_ticks()
-			if self.sounds_on:
-				self.button_click.play()
+			sound_bank.play('button')
+		return rects
 
-	def gameover(self, mouse_down, mouse_pos):
+	def loading(self):
+		# shown after start was pressed but the level is still being built
+		self.drawn_state = None  # the progress bar changes every frame
 		self.display_bg()
+		check_surface(self.loading_label.image, 'label')
+		self.display_surface.blit(self.loading_label.image, self.loading_label.rect)
+
+		bar = pg.Rect(0, 0, self.WIDTH / 3, 20)
+		bar.midtop = (self.WIDTH / 2, self.loading_label.rect.bottom + 30)
+		progress = bar.copy()
+		progress.width = bar.width * self.level_loader.progress
+		pg.draw.rect(self.display_surface, (230, 230, 230), progress)
+		pg.draw.rect(self.display_surface, (230, 230, 230), bar, 2)
+
+		if self.level_ready():
+			self.enter_level()
 
+	def gameover(self, mouse_down, mouse_pos):
+		labels = []
 		if self.level.failed:  # if character is dead, player loses
-			self.display_surface.blit(self.lose_label.image, self.lose_label.rect)
+			labels.append(self.lose_label)
 		elif self.level.completed:
-			self.display_surface.blit(self.win_label.image, self.win_label.rect)  # otherwise player wins
-
-		self.display_surface.blit(self.score_label.image, self.score_label.rect)
+			labels.append(self.win_label)  # otherwise player wins
+		labels.append(self.score_label)
 
-		self.gameover_buttons.update(mouse_down, mouse_pos, self.sounds_on)
-		self.gameover_buttons.draw(self.display_surface)
+		self.gameover_buttons.update(mouse_down, mouse_pos)
+		rects = self.draw_screen(self.gameover_buttons, labels)
 
 		if pg.time.get_ticks() - self.last_button_press < 100:
-			return
+			return rects
 
 		if self.gameover_buttons.restart_btn.pressed:
 			self.restart_level()
@@ -208,65 +249,86 @@ class Game:
 			self.goto_settings()
 		if self.gameover_buttons.quit_btn.pressed:
 			self.quit()
+		return rects
 
 	# endregion
 
 	# region button methods
 	def goto_settings(self):
-		if self.sounds_on:
-			self.button_click.play()
+		sound_bank.play('button')
 		self.last_button_press = pg.time.get_ticks()
 
 		self.prev_state = self.state
 		self.state = 'settings'
 
 	def restart_level(self):
-		if self.sounds_on:
-			self.button_click.play()
+		sound_bank.play('button')
 		self.last_button_press = pg.time.get_ticks()
 
-		self.level.level_complete_music.stop()
-		self.level.level_failed_music.stop()
-		self.level.torch_sound.stop()
+		sound_bank.stop('level complete')
+		sound_bank.stop('level fail')
+		sound_bank.stop('torch')
 
 		self.score_label.update_text('Coins: ')  # reset the score label
 		self.prev_state = self.state
 		self.state = 'game'
 		self.health = 100
-		self.level = Level(self.display_surface, self.pause_btn, self.health)  # recreate level
+		self.level.reset(self.health)  # put every entity back to its spawn state
 		self.coins = 0  # reset coins and health
 
-		if self.sounds_on:
-			self.level.torch_sound.play(-1)
-		if self.music_on:
-			self.level.level_music.play(-1)
+		sound_bank.play('torch', -1)
+		sound_bank.play('level bg', -1)
+
+	def load_level(self):
+		# nothing is scheduled once the game quit and shut the loader down
+		if self.level_future is None and not self.level_loader.cancelled.is_set():
+			self.level_future = self.level_loader.load(self.display_surface, self.pause_btn, self.health)
+
+	def level_ready(self):
+		if self.level_loader.cancelled.is_set():
+			return False  # the game is quitting; the build it cancelled is not an error
+		self.load_level()
+		if self.level is None and self.level_future.done():
+			self.level = self.level_future.result()  # re-raises anything that failed on the loader thread
+		return self.level is not None
 
 	def open_level(self):
-		if self.sounds_on:
-			self.button_click.play()
+		sound_bank.play('button')
 		self.last_button_press = pg.time.get_ticks()
 
 		self.prev_state = self.state
+		if not self.level_ready():
+			self.state = 'loading'
+			return
+		self.enter_level()
+
+	def enter_level(self):
+		if self.ui is None:
+			self.ui = UI(self.display_surface, self.health, registry.font(self.font_path, 60), registry.font(self.font_path, 35))
 		self.state = 'game'
 		self.open_level_time = pg.time.get_ticks()
-		if self.sounds_on:
-			self.level.torch_sound.play(-1)
-		if self.music_on:
-			self.level.level_music.play(-1)
+		sound_bank.play('torch', -1)
+		sound_bank.play('level bg', -1)
 
 	def quit(self):
 		self.running = False
+		self.level_loader.shutdown()
 
 	# endregion
 
 	def run(self, dt, keys, mouse_down, mouse_pos):
+		# returns the rects of the screen that changed, None if the whole screen has to be updated
+		rects = None
 		if self.state == 'menu':
-			self.menu(mouse_down, mouse_pos)
+			rects = self.menu(mouse_down, mouse_pos)
 		if self.state == 'game':
-			self.play(dt, keys, mouse_down, mouse_pos)
+			rects = self.play(dt, keys, mouse_down, mouse_pos)
 		if self.state == 'settings':
-			self.settings(mouse_down, mouse_pos)
+			rects = self.settings(mouse_down, mouse_pos)
 		if self.state == 'pause':
-			self.pause(mouse_down, mouse_pos)
+			rects = self.pause(mouse_down, mouse_pos)
 		if self.state == 'gameover':
-			self.gameover(mouse_down, mouse_pos)
+			rects = self.gameover(mouse_down, mouse_pos)
+		if self.state == 'loading':
+			rects = self.loading()
+		return rects
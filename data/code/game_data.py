@@ -78,6 +78,19 @@ folder_animations = {
 	'torch': 'data/assets/tile assets/tiles/torch animation/',
 }
 
+# texture atlas packed by data/code/atlas.py; assets missing from it (or all of them, if it was
+# never built or this is set to None) are loaded from the loose files above
+atlas_graphics = {
+	'index': 'data/assets/atlas/atlas.idx',
+}
+
+# the level is read from the tiled map, or from the csv layers above if there is none; the binary level
+# compiled by data/code/level_compiler.py is used instead while it is newer than its source
+level_graphics = {
+	'tmx': 'data/levels/level 1/level.tmx',
+	'compiled': 'data/levels/level 1/level.bin',
+}
+
 button_images = {
 	'start': ['data/assets/ui/buttons/start button.png', 'data/assets/ui/buttons/start button hovered.png'],
 	'restart': ['data/assets/ui/buttons/restart button.png', 'data/assets/ui/buttons/restart button hovered.png'],
@@ -120,3 +133,24 @@ audio_paths = {
 	'button': 'data/assets/audio/button click.wav',
 	'torch': 'data/assets/audio/torch burning.wav'
 }
+
+sounds = {
+	# name: (path, category, volume, max simultaneous voices)
+	'level bg': (audio_paths['level']['bg'], 'music', 0.8, 1),
+	'level complete': (audio_paths['level']['complete'], 'music', 1, 1),
+	'level fail': (audio_paths['level']['fail'], 'music', 1, 1),
+	'button': (audio_paths['button'], 'ui', 0.5, 1),
+	'torch': (audio_paths['torch'], 'world', 0.5, 1),
+	'coin collect': (audio_paths['coin']['collect'], 'world', 1, 3),
+	'player attack': (audio_paths['player']['attack'], 'player', 1, 1),
+	'player land': (audio_paths['player']['land'], 'player', 0.7, 1),
+	'player death': (audio_paths['player']['death'], 'player', 1, 1),
+	'player burn': (audio_paths['player']['burn'], 'player', 1, 1),
+	'player hit': (audio_paths['player']['hit'], 'player', 1, 1),
+	'enemy hit': (audio_paths['enemy']['hit'], 'enemy', 1, 3),
+	'enemy death': (audio_paths['enemy']['death'], 'enemy', 1, 3),
+	'skeleton attack': (audio_paths['enemy']['attack']['skeleton'], 'enemy', 1, 2),
+	'eye attack': (audio_paths['enemy']['attack']['eye'], 'enemy', 1, 2),
+	'mushroom attack': (audio_paths['enemy']['attack']['eye'], 'enemy', 1, 2),
+	'goblin attack': (audio_paths['enemy']['attack']['goblin'], 'enemy', 1, 2),
+}
@@ -1,96 +1,116 @@
 import pygame as pg
-from tiles import *
-from config import player_full_size
+from tiles import StaticTile, Border, BackgroundTile, Door, Lava, Fire, Coin, Torch
+from config import player_full_size, tile_size
 from player import Player
-from vfx import Dust, Shockwave, Splash
-from support import *
-from game_data import *
-from enemy import *
-from random import randint
+from vfx import DustPool, Shockwave
+from particles import ParticleSystem
+from support import import_level, import_cut_graphics
+from game_data import csv_graphics, png_graphics, spritesheet_animations, level_graphics
+from enemy import Eye, Goblin, Mushroom, Skeleton
+from tilemap import TileMap
+from culling import Culler
+from camera import Camera
+from render import RenderQueue
+from audio import sound_bank
 
 
 class Level:
-	def __init__(self, surface, pause_btn, health):
+	def __init__(self, surface, pause_btn, health, progress=None):
 		# general setup
 		self.display_surface = surface
 		self.WIDTH = surface.get_width()
 		self.HEIGHT = surface.get_height()
 		self.map_width = 0
-		self.true_scroll = [0, 0]
 		self.shift = [0, 0]
-
-		self.coins = 0
-		self.coins_required = 0
-		self.current_health = health
-		self.gained_health = 0
 		self.weapon_strength = 15
 
+		# the level keeps world coordinates, the camera offset is only added when drawing
+		self.camera = Camera((self.WIDTH, self.HEIGHT))
+		# only what is near the screen is drawn
+		self.culler = Culler((self.WIDTH, self.HEIGHT))
+		self.render_queue = RenderQueue(surface)
+
 		# vfx setup
 		self.dust_sprite = pg.sprite.Group()
+		self.dust_pool = DustPool()
+		self.particles = ParticleSystem(surface)
 		self.transition = None
-		self.visual_effects = []
 
 		self.downloaded = False
-		self.completed = False
-		self.failed = False
-		self.gameover = False
-		self.gameover_time = 0
-
-		self.sounds_on = True
-		self.torch_sound = pg.mixer.Sound(audio_paths['torch'])
-		self.torch_sound.set_volume(0.5)
-		self.button_click = pg.mixer.Sound(audio_paths['button'])
-		self.button_click.set_volume(0.5)
 
-		self.level_music = pg.mixer.Sound(audio_paths['level']['bg'])
-		self.level_music.set_volume(0.8)
-		self.level_complete_music = pg.mixer.Sound(audio_paths['level']['complete'])
-		self.level_failed_music = pg.mixer.Sound(audio_paths['level']['fail'])
-
-		self.paused = False
 		self.pause_btn = pause_btn
 		self.pause_btn.rect.topright = (self.WIDTH - 10, 10)
 		self.pause_group = pg.sprite.GroupSingle()
 		self.pause_group.add(pause_btn)
 
+		# loading progress is reported to LevelLoader while the level is first built, never by reset
+		self.progress = progress or (lambda fraction: None)
+		self.layers_loaded = 0
 		self.setup_tiles()
+		self.reset(health)
+		self.layer_loaded()  # the entities
 
-	# region create methods: setup_tiles, create_tile_group, create_single_group, create_particles
+	# region create methods: setup_tiles, reset, create_tile_group, create_single_group, create_particles
 	def setup_tiles(self):
-		# player
-		player_layout = import_csv_layout(csv_graphics['player'])
-		self.player = self.create_single_group(player_layout, 'player')
-		# blocks layout
-		block_layout = import_csv_layout(csv_graphics['blocks'])
-		self.block_sprites = self.create_tile_group(block_layout, 'blocks')
-		# door background
-		door_layout = import_csv_layout(csv_graphics['door'])
-		self.door_sprite = self.create_single_group(door_layout, 'door')
+		# the layouts are read once and kept as the immutable spawn snapshot of the level; they come from the
+		# memory-mapped compiled level when it was built, otherwise from the tmx map or the csv layers
+		self.layouts, self.metadata = import_level(level_graphics, csv_graphics)
+
+		# static layers never change during a run, so they are built once
+		# blocks layout; drawn from pre-rendered chunks, the sprites are only used for collision
+		self.block_sprites = self.create_tile_group(self.layouts['blocks'], 'blocks')
+		self.block_map = TileMap(self.block_sprites, tile_size, (0, self.HEIGHT - len(self.layouts['blocks']) * tile_size[1]))
+		self.layer_loaded()
 		# lava
-		lava_layout = import_csv_layout(csv_graphics['lava'])
-		self.lava_sprites = self.create_tile_group(lava_layout, 'lava')
-		# coins
-		coin_layout = import_csv_layout(csv_graphics['coins'])
-		self.coin_sprites = self.create_tile_group(coin_layout, 'coins')
-		self.coins_required = len(self.coin_sprites)
+		self.lava_sprites = self.create_tile_group(self.layouts['lava'], 'lava')
+		self.layer_loaded()
 		# torches
-		torch_layout = import_csv_layout(csv_graphics['torch'])
-		self.torch_sprites = self.create_tile_group(torch_layout, 'torch')
+		self.torch_sprites = self.create_tile_group(self.layouts['torch'], 'torch')
+		self.layer_loaded()
 		# borders
-		borders_layout = import_csv_layout(csv_graphics['borders'])
-		self.border_sprites = self.create_tile_group(borders_layout, 'borders')
+		self.border_sprites = self.create_tile_group(self.layouts['borders'], 'borders')
+		self.layer_loaded()
+		# background; pre-rendered into one parallax plane, the tiles themselves aren't kept
+		bg_sprites = self.create_tile_group(self.layouts['background'], 'background')
+		bg_origin = (0, self.HEIGHT - len(self.layouts['background']) * tile_size[1])
+		self.bg_map = TileMap(bg_sprites, tile_size, bg_origin, BackgroundTile.parallax_index)
+		self.layer_loaded()
+
+		# the camera stops at the left edge of the background and the right edge of the far right block
+		right = (self.metadata['far right block'][0] + 1) * tile_size[0]
+		self.bounds = pg.Rect(self.bg_map.area.left, 0, right - self.bg_map.area.left, self.HEIGHT)
+
+	def reset(self, health):
+		# restores the initial state from the spawn snapshot; assets come from the registry, so no disk I/O
+		self.true_scroll = [0, 0]
+		self.shift = [0, 0]
+		self.camera.reset()
+
+		self.coins = 0
+		self.current_health = health
+		self.gained_health = 0
+
+		self.dust_sprite.empty()
+		self.run_particle = None
+		self.visual_effects = []
+		self.particles.clear()
+
+		self.completed = False
+		self.failed = False
+		self.gameover = False
+		self.gameover_time = 0
+		self.paused = False
+
+		# entities that move, die or get collected are rebuilt from their cached frames
+		# player
+		self.player = self.create_single_group(self.layouts['player'], 'player')
+		# door background
+		self.door_sprite = self.create_single_group(self.layouts['door'], 'door')
+		# coins
+		self.coin_sprites = self.create_tile_group(self.layouts['coins'], 'coins')
+		self.coins_required = self.metadata['coins required']
 		# enemies
-		enemy_layout = import_csv_layout(csv_graphics['enemies'])
-		self.enemy_sprites = self.create_tile_group(enemy_layout, 'enemies')
-		# background
-		bg_layout = import_csv_layout(csv_graphics['background'])
-		self.bg_sprites = self.create_tile_group(bg_layout, 'background')
-
-		self.shift[0] = 0
-		self.far_right_block = self.block_sprites.sprites()[0]
-		for block in self.block_sprites.sprites():
-			if block.rect.right > self.far_right_block.rect.right:
-				self.far_right_block = block
+		self.enemy_sprites = self.create_tile_group(self.layouts['enemies'], 'enemies')
 
 		self.downloaded = True
 
@@ -102,18 +122,17 @@ class Level:
 		tile_list = []
 		if type == 'blocks' or type == 'background':
 			# create a list of tiles outside of the loop to use it inside of it
-			tile_list = import_cut_graphics(png_graphics[type], tile_size)
+			tile_list = import_cut_graphics(png_graphics[type], tile_size, 'white')
 
 		for r, row in enumerate(layout):
 			for c, col in enumerate(row):
-				if col != '-1':
-					x = c * tile_size[0] + self.shift[0]
+				if col != -1:
+					x = c * tile_size[0]
 					y = r * tile_size[1] + y_offset
 					if type == 'blocks':
-						tile_surface = tile_list[int(col)]
-						tile_surface.set_colorkey((255, 255, 255))
+						tile_surface = tile_list[col]
 						size = tile_size
-						if int(col) >= 5:
+						if col >= 5:
 							size = (90, 70)
 						sprite = StaticTile((x, y), size, tile_surface)
 					if type == 'fire':
@@ -127,16 +146,16 @@ class Level:
 					if type == 'borders':
 						sprite = Border((x, y), tile_size)
 					if type == 'enemies':
-						if col == '0':  # mushroom
+						if col == 0:  # mushroom
 							sprite = Mushroom((x, y))
-						if col == '1':  # skeleton
+						if col == 1:  # skeleton
 							sprite = Skeleton((x, y))
-						if col == '2':  # eye
+						if col == 2:  # eye
 							sprite = Eye((x, y))
-						if col == '3':  # goblin
+						if col == 3:  # goblin
 							sprite = Goblin((x, y))
 					if type == 'background':
-						tile_surface = tile_list[int(col)]
+						tile_surface = tile_list[col]
 						sprite = BackgroundTile((x, y), tile_size, tile_surface)
 					sprite_group.add(sprite)
 		return sprite_group
@@ -147,8 +166,8 @@ class Level:
 		y_offset = self.HEIGHT - len(layout) * tile_size[1]
 		for r, row in enumerate(layout):
 			for c, col in enumerate(row):
-				if col != '-1':
-					x = c * tile_size[0] + self.shift[0]
+				if col != -1:
+					x = c * tile_size[0]
 					y = r * tile_size[1] + y_offset
 					if type == 'door':
 						sprite = Door((x, y - 30), 256, 120, spritesheet_animations['door'])
@@ -158,32 +177,33 @@ class Level:
 					break
 		return sprite_group
 
+	def layer_loaded(self):
+		# setup_tiles builds five static layers, then reset builds the entities as a sixth step
+		self.layers_loaded += 1
+		self.progress(min(self.layers_loaded / 6, 1))
+
 	def create_particles(self, type, pos):
 		player = self.player.sprite
 
-		if type == 'jump':
-			jump_particle = Dust(pos, 'jump')
-			self.dust_sprite.add(jump_particle)
-
-		elif type == 'land':
-			land_particle = Dust(pos, 'land')
-			self.dust_sprite.add(land_particle)
-
-		elif type == 'run':
+		if type == 'run':
 			flip = player.facing_left
-			run_particle = Dust(pos, 'run', flip=flip)
-			self.dust_sprite.add(run_particle)
+			self.run_particle = self.dust_pool.get(pos, 'run', flip=flip)
+			self.dust_sprite.add(self.run_particle)
+
+		else:  # jump or land
+			self.dust_sprite.add(self.dust_pool.get(pos, type))
 
 	# endregion
 
 	# region player movement logic
 	def scroll_x(self):
-		# scroll the entire level so that it follows the player and always stays in view (SMOOTH!!!)
+		# move the camera so that it follows the player and the level always stays in view (SMOOTH!!!)
+		# the shift is applied to the camera at the start of the next frame
 		player = self.player.sprite
-		player_x = player.collisionbox.centerx
+		player_x = self.camera.to_screen(player.collisionbox.center)[0]
 		player_width = player.collisionbox.width
-		left_side_x = self.bg_sprites.sprites()[0].rect.x
-		right_side_x = self.far_right_block.rect.right
+		left_side_x = self.bounds.left + self.camera.offset(self.bg_map.parallax)[0]
+		right_side_x = self.bounds.right + self.camera.offset()[0]
 
 		self.true_scroll[0] = (self.WIDTH / 2 - player_x) / 20
 		if left_side_x + int(self.true_scroll[0]) > 0 or right_side_x + int(self.true_scroll[0]) < self.WIDTH:
@@ -201,18 +221,14 @@ class Level:
 		player.collisionbox.centerx = player.pos.x
 
 		# create and kill run particles
-		dust_particles = self.dust_sprite.sprites()
-		running_particle = False
-		for dust in dust_particles:
-			if dust.type == 'run':  # find the running particle among others
-				if player.state == 'run':  # if player is running, then keep the particle
-					running_particle = True
-				else:
-					dust.kill()  # otherwise kill it
-		if not running_particle and player.state == 'run':  # if there are no running particles but the player is running
-			self.create_particles('run', player.rect.midbottom)  # create them
-
-		collideble = [*self.block_sprites.sprites(), self.door_sprite.sprite]
+		if player.state == 'run':
+			if self.run_particle is None:  # if the player is running but there is no running particle yet
+				self.create_particles('run', player.rect.midbottom)  # create it
+		elif self.run_particle is not None:  # otherwise kill it
+			self.run_particle.kill()
+			self.run_particle = None
+
+		collideble = [*self.block_map.tiles_at(player.collisionbox), self.door_sprite.sprite]
 
 		# if the player hits the wall he stops running
 		for tile in collideble:
@@ -232,7 +248,7 @@ class Level:
 		player.old_rect = player.collisionbox.copy()
 		player.apply_gravity(dt)  # always move the player down
 
-		collideble = [*self.block_sprites.sprites(), self.door_sprite.sprite]
+		collideble = [*self.block_map.tiles_at(player.collisionbox), self.door_sprite.sprite]
 
 		dead_eyes = []  # if eyemonster dies, it has to fall down
 		for eye in self.enemy_sprites.sprites():
@@ -251,7 +267,7 @@ class Level:
 					player.collisionbox.bottom = tile.rect.top
 					if player.is_jumping or player.state == 'fall' and not player.on_ground:
 						# if collided with the floor while jumping => land
-						player.land(self.sounds_on)
+						player.land()
 						self.create_particles('land', player.rect.midbottom)
 					player.direction.y = 0
 					player.is_jumping = False
@@ -261,7 +277,8 @@ class Level:
 					player.collisionbox.top = tile.rect.bottom
 					player.direction.y = 0
 
-			for eye in dead_eyes:
+		for eye in dead_eyes:
+			for tile in [*self.block_map.tiles_at(eye.innerbox), self.door_sprite.sprite]:
 				if tile.rect.colliderect(eye.innerbox):
 					eye.pos.y = tile.rect.top - 88
 					eye.fallen = True
@@ -281,21 +298,20 @@ class Level:
 	def check_fire_collision(self):
 		player = self.player.sprite
 		lava_tiles = self.lava_sprites.sprites()
+		# lava is drawn with parallax, so it burns where it is seen: its world rect is moved by the difference
+		# between its camera offset and the player's
+		lava_x, lava_y = self.camera.offset(Lava.parallax_index)
+		x, y = self.camera.offset()
+		lava_shift = (lava_x - x, lava_y - y)
 
 		# if player hits fire, he dies
 		for fire in lava_tiles:
-			if fire.rect.colliderect(player.collisionbox) and (player.collisionbox.y <= (fire.rect.bottom)):
+			fire_rect = fire.rect.move(lava_shift)
+			if fire_rect.colliderect(player.collisionbox) and (player.collisionbox.y <= (fire_rect.bottom)):
 				self.gained_health = 0
 				if not player.burnt:
-					for i in range(200):
-						self.visual_effects.append(Splash(
-							player.collisionbox.midbottom,
-							[randint(0, 250) / 10 - 12.5, randint(0, 200) / 10 - 21],
-							randint(20, 30),
-							(randint(200, 255), randint(0, 50), randint(0, 50)),
-							self.display_surface)
-						)
-					player.burn(self.sounds_on)
+					self.particles.splash(player.collisionbox.midbottom)
+					player.burn()
 
 	def check_coin_collision(self):
 		player = self.player.sprite
@@ -304,7 +320,7 @@ class Level:
 		# if player collides with coins, he collects them
 		for coin in coins:
 			if coin.hitbox.colliderect(player.collisionbox) and not coin.collected:
-				coin.collect(self.sounds_on)
+				coin.collect()
 				self.gained_health += 5
 				self.coins += 1
 				self.visual_effects.append(Shockwave(coin.rect.center, 30, 3, 1.1, 'white', self.display_surface))
@@ -323,21 +339,21 @@ class Level:
 						else:
 							enemy.facing_left = True
 							enemy.direction_x = -1
-						enemy.get_damage(self.weapon_strength, self.sounds_on)
+						enemy.get_damage(self.weapon_strength)
 						self.visual_effects.append(
 							Shockwave(enemy.innerbox.center, 30, 3, 1.1, 'white', self.display_surface))
 
 
 				elif not player.invincible and enemy.state != 'take hit':
 					if enemy.attackbox.colliderect(player.collisionbox):
-						enemy.attack(self.sounds_on)
+						enemy.attack()
 						if enemy.frame_index >= 6:  # in the attack spritesheet 7th frame is the actual attack
 							# player needs to be facing the enemy when being attacked
 							if enemy.facing_left:
 								player.facing_left = False
 							else:
 								player.facing_left = True
-							player.get_damage(self.sounds_on)
+							player.get_damage()
 							self.gained_health -= enemy.strength
 
 			else:
@@ -347,8 +363,7 @@ class Level:
 					self.gained_health += int(enemy.strength * 0.75)
 					self.visual_effects.append(
 						Shockwave(enemy.innerbox.center, 50, 10, 2.1, 'white', self.display_surface))
-					if self.sounds_on:
-						enemy.death_sound.play()
+					sound_bank.play('enemy death')
 				enemy.state = 'death'
 				if enemy.is_killed:
 					enemy.kill()
@@ -366,7 +381,7 @@ class Level:
 
 		player = self.player.sprite
 		if self.current_health <= 0 and player.action != 'death':
-			player.die(self.sounds_on)
+			player.die()
 			for i in range(5):
 				self.visual_effects.append(
 					Shockwave(player.collisionbox.center, i * 30 + 50, i * 2.5 + 5, i / 4 + 1, 'white',
@@ -403,12 +418,10 @@ class Level:
 
 	# endregion
 
-	def run(self, dt, health, keys, mouse_down, mouse_pos, sounds_on):
-		self.sounds_on = sounds_on
+	def run(self, dt, health, keys, mouse_down, mouse_pos):
 		self.current_health = health
 
-		self.draw(dt, mouse_down, keys)
-		self.pause_group.draw(self.display_surface)
+		self.update(dt, mouse_down, keys)
 		player = self.player.sprite
 
 		self.x_movement(dt)
@@ -422,10 +435,12 @@ class Level:
 			door.is_opened = True
 			self.visual_effects.append(Shockwave(door.entrance_center, 70, 7, 2, 'white', self.display_surface))
 
-		for i, effect in sorted(enumerate(self.visual_effects), reverse=True):
-			effect.update(self.shift, dt)
-			if not effect.alive:
-				self.visual_effects.pop(i)
+		# the frame is drawn once everything has moved; effects are drawn before they advance
+		self.draw()
+		for effect in self.visual_effects:
+			effect.update(dt)
+		self.visual_effects = [effect for effect in self.visual_effects if effect.alive]
+		self.particles.update()
 
 		if self.check_gameover() or self.check_win():
 			self.failed = not self.completed
@@ -438,49 +453,54 @@ class Level:
 				self.gameover = True
 		else:
 			# pause is possible only before the game is over
-			self.pause_group.update(mouse_down, mouse_pos, sounds_on)
+			self.pause_group.update(mouse_down, mouse_pos)
 			if ((mouse_down and self.pause_btn.hovered) or keys[pg.K_ESCAPE]) and not \
 					(self.player.sprite.is_dead or self.player.sprite.burnt or self.player.sprite.action == 'death'):
 				self.paused = True
-				if sounds_on:
-					self.button_click.play()
+				sound_bank.play('button')
 				return
 
-	def draw(self, dt, mouse_down, keys):
-		# backround
-		self.bg_sprites.update(self.shift)
-		self.bg_sprites.draw(self.display_surface)
-		# dust particles
-		self.dust_sprite.update(self.shift, self.player.sprite.rect.midbottom, self.player.sprite.facing_left, dt)
-		self.dust_sprite.draw(self.display_surface)
-		# torch
-		self.torch_sprites.update(self.shift, dt)
-		self.torch_sprites.draw(self.display_surface)
-		# coins
-		self.coin_sprites.update(self.shift, dt)
-		self.coin_sprites.draw(self.display_surface)
-		# door
-		self.door_sprite.update(self.shift, dt)
-		self.door_sprite.draw(self.display_surface)
-		# player
-		self.player.update(dt, self.shift, mouse_down, keys, self.sounds_on)
-		self.player.draw(self.display_surface)
+	def update(self, dt, mouse_down, keys):
+		# animations and input; movement and collisions follow in run
+		self.camera.scroll(self.shift)
+		offset = self.camera.offset()
+		self.dust_sprite.update(self.player.sprite.rect.midbottom, self.player.sprite.facing_left, dt)
+		self.culler.update(self.torch_sprites, dt, self.camera.offset(Torch.parallax_index))
+		self.culler.update(self.coin_sprites, dt, offset)
+		self.door_sprite.update(dt)
+		self.player.update(dt, mouse_down, keys)
+		self.culler.update(self.lava_sprites, dt, self.camera.offset(Lava.parallax_index))
+		# enemies keep moving and animating off screen, they are only not drawn there. borders are in world
+		# coordinates too, so patrols turn exactly at them (they used to turn one scroll shift off)
+		self.enemy_sprites.update(self.border_sprites.sprites(), dt)
+
+	def draw(self):
+		# everything is submitted to the render queue, which draws it with one blits call per layer
+		queue = self.render_queue
+		offset = self.camera.offset()
+		self.culler.start()
+		self.bg_map.draw(queue, 'background', self.camera.offset(self.bg_map.parallax))
+		self.culler.draw(self.dust_sprite, queue, 'dust', offset)
+		self.culler.draw(self.torch_sprites, queue, 'torch', self.camera.offset(Torch.parallax_index))
+		self.culler.draw(self.coin_sprites, queue, 'coins', offset)
+		self.culler.draw(self.door_sprite, queue, 'door', offset)
+
+		# when attacks player should be drawn upon the blocks
+		player = self.player.sprite
+		queue.submit('player attack' if player.state == 'attack' else 'player', player.image, player.rect.move(offset))
 		if self.completed:
 			door = self.door_sprite.sprite
-			self.display_surface.blit(door.open_front_frames[int(door.frame_index)], door.rect.topleft)
-		# lava
-		self.lava_sprites.update(self.shift, dt)
-		self.lava_sprites.draw(self.display_surface)
-		# blocks
-		self.block_sprites.update(self.shift)
-		self.block_sprites.draw(self.display_surface)
+			queue.submit('door front', door.open_front_frames[int(door.frame_index)], door.rect.move(offset))
 
-		if self.player.sprite.state == 'attack':  # when attacks player should be drawn upon the blocks
-			self.player.draw(self.display_surface)
+		self.culler.draw(self.lava_sprites, queue, 'lava', self.camera.offset(Lava.parallax_index))
+		self.block_map.draw(queue, 'blocks', offset)
+		self.culler.draw(self.enemy_sprites, queue, 'enemies', offset)
+		# borders are invisible, they only turn the enemies around
+		self.culler.skip(self.border_sprites, 'borders')
 
-		# enemies
-		self.enemy_sprites.update(self.shift, self.border_sprites.sprites(), dt)
-		self.enemy_sprites.draw(self.display_surface)
-		# borders
-		self.border_sprites.update(self.shift)
-		self.border_sprites.draw(self.display_surface)
+		for effect in self.visual_effects:
+			effect.draw(queue, 'effects', offset)
+		self.particles.draw(queue, 'effects', offset)
+		queue.submit('ui', self.pause_btn.image, self.pause_btn.rect)
+
+		queue.flush()
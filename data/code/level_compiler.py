@@ -0,0 +1,53 @@
+import sys
+from array import array
+from os.path import exists
+
+# offline tool, run from the project root: python data/code/level_compiler.py [output path]
+from game_data import csv_graphics, level_graphics
+from support import import_csv_level, import_tmx_level, level_header, level_info, level_enemy, level_layer, level_magic, level_version
+
+
+def compile_level(layers, metadata, path):
+	# header, metadata, enemy spawns and the layer table, followed by one int16 grid per layer
+	cols, rows = metadata['size']
+	names = list(layers)
+	for name in names:
+		if len(name.encode('ascii')) > 16:
+			raise ValueError(f'layer name {name!r} is longer than 16 characters')
+		if len(layers[name]) != rows or any(len(row) != cols for row in layers[name]):
+			raise ValueError(f'layer {name!r} is not {cols}x{rows} tiles')
+
+	enemies = metadata['enemies']
+	grids_offset = level_header.size + level_info.size + len(enemies) * level_enemy.size + len(names) * level_layer.size
+	grids_offset += grids_offset % 2  # keep the grids aligned for memoryview.cast
+	grid_size = cols * rows * 2
+
+	with open(path, 'wb') as level_file:
+		level_file.write(level_header.pack(level_magic, level_version, cols, rows, len(names)))
+		level_file.write(level_info.pack(
+			*metadata['player'], *metadata['door'], metadata['coins required'],
+			*metadata['far right block'], len(enemies)))
+		for enemy in enemies:
+			level_file.write(level_enemy.pack(*enemy))
+		for i, name in enumerate(names):
+			level_file.write(level_layer.pack(name.encode('ascii'), grids_offset + i * grid_size))
+		level_file.write(bytes(grids_offset - level_file.tell()))
+
+		for name in names:
+			grid = array('h', (value for row in layers[name] for value in row))
+			if sys.byteorder != 'little':
+				grid.byteswap()
+			level_file.write(grid.tobytes())
+
+	print(f'compiled {len(names)} layers of {cols}x{rows} tiles -> {path}')
+
+
+def source_level():
+	# the tiled map is the source of truth; the csv export is only used when there is no map
+	if exists(level_graphics['tmx']):
+		return import_tmx_level(level_graphics['tmx'])
+	return import_csv_level(csv_graphics)
+
+
+if __name__ == '__main__':
+	compile_level(*source_level(), sys.argv[1] if len(sys.argv) > 1 else level_graphics['compiled'])
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from audio import sound_bank
+from profiler import profiler
+
+
+class LoadCancelled(Exception):
+	pass
+
+
+class LevelLoader:
+	def __init__(self):
+		# one worker: levels are built in the background while the main thread keeps drawing the menu
+		self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+		self.progress = 0
+		self.cancelled = Event()
+
+	def load(self, surface, pause_btn, health):
+		# parses the layouts and decodes the assets on the worker; returns a Future resolving to the Level
+		self.progress = 0
+		return self.executor.submit(self.build, surface, pause_btn, health)
+
+	def build(self, surface, pause_btn, health):
+		# the level, enemy and vfx modules are only imported here, off the main thread
+		with profiler.phase('level', 'import'):
+			from level import Level
+
+		with profiler.phase('Level', 'level'):
+			level = Level(surface, pause_btn, health, self.set_progress)
+		with profiler.phase('sounds', 'level'):
+			sound_bank.load()  # the music, world, player and enemy sounds
+		self.progress = 1
+		return level
+
+	def set_progress(self, progress):
+		# called by the level between its layers, which is where a build that is no longer wanted stops
+		if self.cancelled.is_set():
+			raise LoadCancelled
+		self.progress = progress
+
+	def shutdown(self):
+		# the worker is joined before pygame is torn down; a build in progress stops after its current layer
+		self.cancelled.set()
+		self.executor.shutdown(wait=True, cancel_futures=True)
@@ -1,44 +1,78 @@
-from sys import exit
-import pygame as pg
-from time import time
-from config import FPS
-from game import Game
-
-pg.init()
-screen = pg.display.set_mode((0, 0), pg.FULLSCREEN)
-pg.display.set_caption('Medieval Apocalypse')
+from sys import argv, exit
+from profiler import profiler
+
+# --profile-startup[=path] writes a timeline of everything up to the first menu frame as json
+profile_path = None
+for arg in argv[1:]:
+	if arg.startswith('--profile-startup'):
+		profile_path = arg.partition('=')[2] or 'startup_profile.json'
+		profiler.enable()
+
+with profiler.phase('pygame', 'import'):
+	import pygame as pg
+with profiler.phase('game', 'import'):
+	from time import time
+	from config import FPS
+	from audio import init_mixer
+	from game import Game
+	from viewport import Viewport
+
+with profiler.phase('pygame init', 'init'):
+	init_mixer()
+	pg.init()
+	window = pg.display.set_mode((0, 0), pg.FULLSCREEN)
+	pg.display.set_caption('Medieval Apocalypse')
+# everything is laid out and drawn at the logical size of the viewport's surface
+viewport = Viewport(window)
+screen = viewport.surface
 screen_width = screen.get_width()
 screen_height = screen.get_height()
 
 clock = pg.time.Clock()
 
-game = Game(screen, 'menu')
+with profiler.phase('Game', 'init'):
+	game = Game(screen, 'menu')
 
 last_time = time()
+first_frame = True
 
 while True:
 	mouse_down = False
-	mouse_pos = pg.mouse.get_pos()
+	mouse_pos = viewport.to_logical(pg.mouse.get_pos())
 
 	for event in pg.event.get():
 		if event.type == pg.QUIT:
-			pg.quit()
-			exit()
+			game.quit()
 		if event.type == pg.MOUSEBUTTONUP:
 			mouse_down = True
+		if event.type in (pg.WINDOWEXPOSED, pg.WINDOWRESTORED):
+			game.redraw()
+			viewport.redraw()
+	# closing the window stops the loader, so no frame is run after it
+	if not game.running:
+		break
 
 	keys = pg.key.get_pressed()
 
 	dt = time() - last_time
 	last_time = time()
 
-	game.run(dt, keys, mouse_down, mouse_pos)
+	rects = game.run(dt, keys, mouse_down, mouse_pos)
 
 	if not game.running:
 		break
 
-	pg.display.flip()
+	# menus only push the buttons that changed
+	viewport.present(rects)
+	if first_frame and profile_path:
+		profiler.mark('first frame')
+		profiler.dump(profile_path)
+		totals = ', '.join(f'{category} {ms:.1f} ms' for category, ms in profiler.totals().items())
+		print(f'first frame after {profiler.timestamp() / 1000:.1f} ms ({totals}) -> {profile_path}')
+	first_frame = False
 	clock.tick(FPS)
 
+if profile_path:
+	profiler.dump(profile_path)  # again, now with the level build from the loader thread
 pg.quit()
 exit()
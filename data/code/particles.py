@@ -0,0 +1,98 @@
+import numpy as np
+import pygame as pg
+from config import particle_capacity
+
+
+class ParticleSystem:
+	def __init__(self, display, capacity=particle_capacity):
+		# every particle lives in the same arrays; only the first count of them are alive
+		self.display = display
+		self.WIDTH, self.HEIGHT = display.get_size()
+		self.capacity = capacity
+		self.count = 0
+		self.pos = np.zeros((capacity, 2))  # world coordinates
+		self.speed = np.zeros((capacity, 2))  # pixels per frame
+		self.gravity = np.zeros(capacity)  # added to the y speed every frame
+		self.radius = np.zeros(capacity)
+		self.color = np.zeros((capacity, 3), dtype=np.uint8)
+		self.rng = np.random.default_rng()
+
+	def clear(self):
+		self.count = 0
+
+	def grow(self, needed):
+		# bursts are rare, so the arrays simply double when they run out of room
+		capacity = self.capacity
+		while capacity < needed:
+			capacity *= 2
+		for name in ('pos', 'speed', 'gravity', 'radius', 'color'):
+			old = getattr(self, name)
+			new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+			new[:self.count] = old[:self.count]
+			setattr(self, name, new)
+		self.capacity = capacity
+
+	def burst(self, pos, speeds, radii, colors, gravity=0.3):
+		# emits len(radii) particles from pos; speeds (n, 2), radii (n,) and colors (n, 3) hold one row per particle
+		n = len(radii)
+		if self.count + n > self.capacity:
+			self.grow(self.count + n)
+		new = slice(self.count, self.count + n)
+		self.pos[new] = pos
+		self.speed[new] = speeds
+		self.gravity[new] = gravity
+		self.radius[new] = radii
+		self.color[new] = colors
+		self.count += n
+
+	def splash(self, pos, count=200):
+		# the lava splash: red drops thrown up and to both sides
+		rng = self.rng
+		speeds = np.column_stack((rng.integers(0, 251, count) / 10 - 12.5, rng.integers(0, 201, count) / 10 - 21))
+		colors = np.column_stack((rng.integers(200, 256, count), rng.integers(0, 51, count), rng.integers(0, 51, count)))
+		self.burst(pos, speeds, rng.integers(20, 31, count), colors)
+
+	def update(self):
+		# moves every particle one frame and drops the ones that shrank away
+		n = self.count
+		if not n:
+			return
+
+		pos, speed = self.pos[:n], self.speed[:n]
+		pos += speed
+		speed[:, 1] += self.gravity[:n]
+		self.radius[:n] -= 0.25
+
+		alive = self.radius[:n] > 0
+		if not alive.all():
+			kept = int(alive.sum())
+			for array in (self.pos, self.speed, self.gravity, self.radius, self.color):
+				array[:kept] = array[:n][alive]
+			self.count = kept
+
+	def draw(self, queue, layer, offset):
+		n = self.count
+		if not n:
+			return
+
+		x = self.pos[:n, 0] + offset[0]
+		y = self.pos[:n, 1] + offset[1]
+		radius = self.radius[:n]
+		# circles under a pixel wide draw nothing
+		visible = (radius >= 1) & (x < self.WIDTH) & (x + 2 * radius > 0) & (y < self.HEIGHT) & (y + 2 * radius > 0)
+		if not visible.any():
+			return
+
+		# every particle has its own random color, so there is nothing to cache: the circles are drawn
+		# exactly as they always were, but in one call from the arrays
+		circles = zip(
+			self.color[:n][visible].tolist(), x[visible].astype(int).tolist(), y[visible].astype(int).tolist(),
+			radius[visible].astype(int).tolist(),
+		)
+		queue.call(layer, self.draw_circles, queue.surface, list(circles))
+
+	@staticmethod
+	def draw_circles(surface, circles):
+		circle = pg.draw.circle
+		for color, x, y, radius in circles:
+			circle(surface, color, (x, y), radius)
@@ -1,15 +1,17 @@
 import pygame as pg
 
 from config import player_full_size, player_frame_size, player_real_size
-from game_data import audio_paths
 from sprite_sheet import SpriteSheet
+from support import flip_frames
+from assets import registry
+from audio import sound_bank
 
 
 class Player(pg.sprite.Sprite):
 	def __init__(self, pos, size, create_particles):
 		super().__init__()
 		# animation, image and rects
-		self.animation_set = self.import_character_assets()
+		self.animation_set, self.flipped_animation_set = registry.get(('player', player_full_size), self.import_character_assets)
 		self.image = pg.Surface(size)
 		self.rect = self.image.get_rect(midbottom=pos)  # for sprite
 
@@ -58,27 +60,23 @@ class Player(pg.sprite.Sprite):
 		self.hurt_time = 0
 
 		self.attack_pressed = False
-		# sounds
-		self.death_sound = pg.mixer.Sound(audio_paths['player']['death'])
-		self.land_sound = pg.mixer.Sound(audio_paths['player']['land'])
-		self.land_sound.set_volume(0.7)
-		self.attack_sound = pg.mixer.Sound(audio_paths['player']['attack'])
-		self.burn_sound = pg.mixer.Sound(audio_paths['player']['burn'])
-		self.hit_sound = pg.mixer.Sound(audio_paths['player']['hit'])
 
 	def import_character_assets(self):
 		base_path = 'data/assets/character/'
 		animation_set = {'idle': [], 'run': [], 'jump': [],
 		                 'jump_to_fall': [], 'fall': [], 'roll': [],
 		                 'attack': [], 'crouch': [], 'death': [], 'hit': []}
+		flipped_animation_set = {}
 
 		# for each set take the image with identical name and get animation frames from it
+		# both facing directions are converted once here, so animate only has to index them
 		for animation in animation_set.keys():
 			full_path = base_path + animation + '.png'
 			sprite_sheet = SpriteSheet(full_path, *player_frame_size, player_full_size, (0, 0, 0))
-			animation_set[animation] = sprite_sheet.import_animation_list()
+			frames = sprite_sheet.import_animation_list()
+			animation_set[animation], flipped_animation_set[animation] = flip_frames(frames)
 
-		return animation_set
+		return animation_set, flipped_animation_set
 
 	def animate(self, dt):
 		animation = self.animation_set[self.state]
@@ -100,9 +98,8 @@ class Player(pg.sprite.Sprite):
 					self.action = ''
 
 		# ... and then take the whole number as the index of current frame
-		image = animation[int(self.frame_index)]
-		image = pg.transform.flip(image, self.facing_left, False).convert_alpha()
-		self.image = image
+		animation_set = self.flipped_animation_set if self.facing_left else self.animation_set
+		self.image = animation_set[self.state][int(self.frame_index)]
 
 	def apply_gravity(self, dt):
 		self.direction.y += self.gravity * dt / 2
@@ -110,11 +107,10 @@ class Player(pg.sprite.Sprite):
 		self.direction.y += self.gravity * dt / 2
 		self.collisionbox.bottom = self.pos.y
 
-	def attack(self, sounds_on):
+	def attack(self):
 		self.action = 'attack'
 		self.frame_index = 0
-		if sounds_on:
-			self.attack_sound.play()
+		sound_bank.play('player attack')
 
 	def jump(self):
 		self.direction.y = self.jump_speed
@@ -122,9 +118,8 @@ class Player(pg.sprite.Sprite):
 		self.on_ground = False
 		self.create_particles('jump', self.rect.midbottom)
 
-	def land(self, sounds_on):
-		if sounds_on:
-			self.land_sound.play()
+	def land(self):
+		sound_bank.play('player land')
 		if self.direction.y > 800 and self.direction.x == 0:
 			self.action = 'crouch'
 		if self.is_too_high:
@@ -133,13 +128,12 @@ class Player(pg.sprite.Sprite):
 		# if moving when landed - roll, otherwise crouch
 		self.on_ground = True
 
-	def get_damage(self, sounds_on):
+	def get_damage(self):
 		if not self.invincible:
 			self.action = 'hit'
 			self.invincible = True
 			self.hurt_time = pg.time.get_ticks()
-			if sounds_on:
-				self.hit_sound.play()
+			sound_bank.play('player hit')
 
 	def invincibility_timer(self):
 		if self.invincible and not self.state == 'death':
@@ -147,16 +141,16 @@ class Player(pg.sprite.Sprite):
 			if current_time - self.hurt_time >= self.invincibility_duration:
 				self.invincible = False
 
-	def burn(self, sounds_on):
-		if sounds_on and not self.burnt:
-			self.burn_sound.play()
-			self.death_sound.play()
+	def burn(self):
+		if not self.burnt:
+			sound_bank.play('player burn')
+			sound_bank.play('player death')
 		self.burnt = True
-		self.die(False)
+		self.die(silent=True)
 
-	def die(self, sounds_on):
-		if sounds_on:
-			self.death_sound.play()
+	def die(self, silent=False):
+		if not silent:
+			sound_bank.play('player death')
 		self.action = 'death'
 		self.invincible = True
 
@@ -191,7 +185,7 @@ class Player(pg.sprite.Sprite):
 		if self.state != prev_state:
 			self.frame_index = 0
 
-	def get_input(self, mouse_down, keys, sounds_on):
+	def get_input(self, mouse_down, keys):
 		if not self.control_allowed: return
 		self.direction.x = 0
 		if self.state == 'death':
@@ -218,7 +212,7 @@ class Player(pg.sprite.Sprite):
 
 		if keys[pg.K_k] or mouse_down:
 			if self.action != 'attack' and not self.attack_pressed:
-				self.attack(sounds_on)
+				self.attack()
 				self.attack_pressed = True
 		else:
 			self.attack_pressed = False
@@ -238,13 +232,12 @@ class Player(pg.sprite.Sprite):
 
 		self.pos = pg.math.Vector2(self.collisionbox.midbottom)
 
-	def update(self, dt, shift, mouse_down, keys, sounds_on):
+	def update(self, dt, mouse_down, keys):
 		if self.death_time:
 			return
 
-		self.get_input(mouse_down, keys, sounds_on)
+		self.get_input(mouse_down, keys)
 		self.get_state()
 		self.animate(dt)
 		self.pos = pg.math.Vector2(self.collisionbox.midbottom)
-		self.pos.x += shift[0]
 		self.invincibility_timer()
@@ -0,0 +1,69 @@
+import json
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StartupProfiler:
+	def __init__(self):
+		self.enabled = False  # switched on by main.py --profile-startup; phases cost nothing while it is off
+		self.start = perf_counter()
+		self.events = []
+		self.lock = threading.Lock()  # the level is built on the loader thread
+
+	def enable(self):
+		self.enabled = True
+		self.start = perf_counter()
+		self.events.clear()
+
+	def timestamp(self):
+		# microseconds since the profiler was enabled
+		return (perf_counter() - self.start) * 1_000_000
+
+	def record(self, event):
+		event['pid'] = 0
+		event['tid'] = threading.get_ident()
+		with self.lock:
+			self.events.append(event)
+
+	@contextmanager
+	def phase(self, name, category):
+		# times the block as one span of the timeline; category is import/font/image/sound/level/frame
+		if not self.enabled:
+			yield
+			return
+
+		start = self.timestamp()
+		try:
+			yield
+		finally:
+			self.record({'name': name, 'cat': category, 'ph': 'X', 'ts': start, 'dur': self.timestamp() - start})
+
+	def mark(self, name):
+		# a single point in time, e.g. the first frame shown
+		if self.enabled:
+			self.record({'name': name, 'cat': 'mark', 'ph': 'i', 's': 'g', 'ts': self.timestamp()})
+
+	def totals(self):
+		# total milliseconds spent per category
+		totals = {}
+		with self.lock:
+			for event in self.events:
+				if event['ph'] == 'X':
+					totals[event['cat']] = totals.get(event['cat'], 0) + event['dur'] / 1000
+		return totals
+
+	def dump(self, path):
+		# chrome trace event format: open it in chrome://tracing or ui.perfetto.dev
+		with self.lock:
+			events = sorted(self.events, key=lambda event: event['ts'])
+		thread_names = [
+			{'name': 'thread_name', 'ph': 'M', 'pid': 0, 'tid': thread.ident, 'args': {'name': thread.name}}
+			for thread in threading.enumerate()
+		]
+		with open(path, 'w') as trace_file:
+			json.dump({'traceEvents': thread_names + events, 'displayTimeUnit': 'ms'}, trace_file, indent=1)
+
+
+# shared by main.py and every module that loads something at startup
+profiler = StartupProfiler()
@@ -0,0 +1,44 @@
+from time import perf_counter
+from assets import check_blits
+
+# the level's layers, back to front
+level_layers = (
+	'background', 'dust', 'torch', 'coins', 'door', 'player', 'door front', 'lava', 'blocks',
+	'player attack',  # when attacking the player is drawn upon the blocks
+	'enemies', 'effects', 'ui',
+)
+
+
+class RenderQueue:
+	def __init__(self, surface, layers=level_layers):
+		# entities submit what they look like after the frame is simulated; flush draws it layer by layer,
+		# in submission order inside a layer, with one blits call per layer
+		self.surface = surface
+		self.view = surface.get_rect()
+		self.blits = {layer: [] for layer in layers}  # layer: [(image, pos)]
+		self.calls = {layer: [] for layer in layers}  # layer: [(function, args)] drawn after its blits
+		self.stats = {layer: (0, 0) for layer in layers}  # layer: (blits, milliseconds) of the last flush
+
+	def submit(self, layer, image, pos):
+		self.blits[layer].append((image, pos))
+
+	def submit_many(self, layer, sequence):
+		self.blits[layer].extend(sequence)
+
+	def call(self, layer, function, *args):
+		# for what can't be a blit, like shapes too big to cache
+		self.calls[layer].append((function, args))
+
+	def flush(self):
+		surface = self.surface
+		for layer, sequence in self.blits.items():
+			calls = self.calls[layer]
+			check_blits(sequence, layer)
+			start = perf_counter()
+			if sequence:
+				surface.blits(sequence, doreturn=False)
+			for function, args in calls:
+				function(*args)
+			self.stats[layer] = (len(sequence), (perf_counter() - start) * 1000)
+			sequence.clear()
+			calls.clear()
@@ -1,29 +1,44 @@
 import pygame as pg
+from assets import registry
+from support import import_image
 
 class SpriteSheet:
 	def __init__(self, path, width, height, scale, color):
 		super().__init__()
-		self.image = pg.image.load(path)
+		self.path = path
+		self.image = registry.get(('canvas', path, height), lambda: self.convert_sheet(path, height))
 		self.rect = self.image.get_rect()
 		self.width = width
 		self.height = height
 		self.scale = scale
 		self.bg_color = color
 
+	def convert_sheet(self, path, height):
+		# the sheet is converted once onto an opaque canvas; frames are views into it
+		sheet = import_image(path, alpha=False)
+		image = pg.Surface((sheet.get_width(), max(sheet.get_height(), height))).convert_alpha()
+		image.blit(sheet, (0, 0))
+		return image
+
 	def get_image(self, frame_index):
 		# get a single frame from a spritesheet based on given parameters
 		offset = (frame_index * self.width, 0)
-		image = pg.Surface((self.width, self.height)).convert_alpha()
-		image.blit(self.image, (0, 0), (*offset, self.width, self.height))
-		image = pg.transform.scale(image, self.scale)
+		image = self.image.subsurface((*offset, self.width, self.height))
+		if tuple(self.scale) != (self.width, self.height):
+			image = pg.transform.scale(image, self.scale)
 		image.set_colorkey(self.bg_color)
 
 		return image
 
-	def import_animation_list(self):
+	def slice_frames(self):
 		frame_number = self.image.get_width() // self.width
 		frames = []
 		for frame in range(frame_number):
 			frames.append(self.get_image(frame))
 
-		return frames
\ No newline at end of file
+		return frames
+
+	def import_animation_list(self):
+		# frames are shared between every sprite cut from the same sheet with the same parameters
+		key = ('sheet', self.path, self.width, self.height, tuple(self.scale), self.bg_color)
+		return registry.get(key, self.slice_frames)
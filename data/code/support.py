@@ -1,7 +1,29 @@
+import sys
+from array import array
+from mmap import mmap, ACCESS_READ
 from os import walk
+from os.path import dirname, exists, getmtime, join
+from struct import Struct
 import pygame as pg
 from csv import reader
 from config import tile_size
+from assets import registry
+from game_data import atlas_graphics
+from tmx import load_tmx
+
+# binary frame index written by atlas.py
+atlas_header = Struct('<4sHHI')  # magic, version, page count, entry count
+atlas_frame = Struct('<HHHHHhhH')  # page, x, y, width, height, pivot x, pivot y, duration in ms
+atlas_magic = b'MAAT'
+atlas_version = 1
+
+# binary level written by level_compiler.py; the grids are little-endian int16, -1 for an empty cell
+level_header = Struct('<4sHHHH')  # magic, version, columns, rows, layer count
+level_info = Struct('<hhhhHhhH')  # player col/row, door col/row, coins required, far right block col/row, enemy count
+level_enemy = Struct('<hhh')  # col, row, enemy type
+level_layer = Struct('<16sI')  # layer name, offset of its grid
+level_magic = b'MALV'
+level_version = 1
 
 
 def import_csv_layout(path):
@@ -15,9 +37,114 @@ def import_csv_layout(path):
 	return layout
 
 
-def import_cut_graphics(path, size):
+def import_level(level_paths, csv_paths):
+	# returns (layers, metadata); layers are {name: rows of ints}. the compiled level is used while it is newer
+	# than its source, otherwise the tmx map is read directly and the exported csv layers are the last resort
+	tmx_path = level_paths.get('tmx')
+	has_tmx = bool(tmx_path) and exists(tmx_path)
+	sources = [tmx_path] if has_tmx else [path for path in csv_paths.values() if exists(path)]
+
+	compiled_path = level_paths.get('compiled')
+	if compiled_path and exists(compiled_path):
+		if getmtime(compiled_path) >= max((getmtime(path) for path in sources), default=0):
+			return import_compiled_level(compiled_path)
+
+	if has_tmx:
+		return import_tmx_level(tmx_path)
+	return import_csv_level(csv_paths)
+
+
+def import_tmx_level(path):
+	# layers keep their chunks, so later passes can work on the non-empty parts only
+	layers = load_tmx(path)
+	return layers, level_metadata(layers)
+
+
+def import_csv_level(paths):
+	# parses every csv layer that exists into a tuple of int rows
+	layers = {}
+	for name, path in paths.items():
+		if exists(path):
+			layers[name] = tuple(tuple(int(cell) for cell in row) for row in import_csv_layout(path))
+
+	return layers, level_metadata(layers)
+
+
+def level_metadata(layers):
+	# everything the level would otherwise have to search the grids for
+	def cells(name):
+		for r, row in enumerate(layers.get(name, ())):
+			for c, value in enumerate(row):
+				if value != -1:
+					yield c, r, value
+
+	def first_cell(name):
+		return next(((c, r) for c, r, value in cells(name)), (-1, -1))
+
+	far_right_block = (-1, -1)
+	for c, r, value in cells('blocks'):
+		if c > far_right_block[0]:  # the topmost block wins a tie, like the sprite scan it replaces
+			far_right_block = (c, r)
+
+	layout = next(iter(layers.values()))
+	return {
+		'size': (len(layout[0]), len(layout)),
+		'player': first_cell('player'),
+		'door': first_cell('door'),
+		'enemies': tuple(cells('enemies')),
+		'coins required': sum(1 for _ in cells('coins')),
+		'far right block': far_right_block,
+	}
+
+
+def import_compiled_level(path):
+	# memory-maps the compiled level; on little-endian machines the rows are read-only views into the file
+	with open(path, 'rb') as level_file:
+		data = mmap(level_file.fileno(), 0, access=ACCESS_READ)
+
+	magic, version, cols, rows, layer_count = level_header.unpack_from(data, 0)
+	if magic != level_magic or version != level_version:
+		raise ValueError(f'{path} is not a version {level_version} compiled level')
+	offset = level_header.size
+
+	player_c, player_r, door_c, door_r, coins_required, block_c, block_r, enemy_count = level_info.unpack_from(data, offset)
+	offset += level_info.size
+	enemies = tuple(level_enemy.unpack_from(data, offset + i * level_enemy.size) for i in range(enemy_count))
+	offset += enemy_count * level_enemy.size
+
+	view = memoryview(data)
+	layers = {}
+	for i in range(layer_count):
+		name, grid_offset = level_layer.unpack_from(data, offset + i * level_layer.size)
+		grid = view[grid_offset:grid_offset + cols * rows * 2]
+		if sys.byteorder == 'little':
+			grid = grid.cast('h')
+		else:
+			swapped = array('h')
+			swapped.frombytes(grid)
+			swapped.byteswap()
+			grid = swapped
+		layers[name.rstrip(b'\0').decode('ascii')] = tuple(grid[r * cols:(r + 1) * cols] for r in range(rows))
+
+	metadata = {
+		'size': (cols, rows),
+		'player': (player_c, player_r),
+		'door': (door_c, door_r),
+		'enemies': enemies,
+		'coins required': coins_required,
+		'far right block': (block_c, block_r),
+	}
+	return layers, metadata
+
+
+def import_cut_graphics(path, size, colorkey=None):
 	# takes a tileset and cuts it in tiles; returns list of surfaces
-	surface = pg.image.load(path).convert_alpha()
+	return registry.get(('cut', path, tuple(size), colorkey), lambda: cut_graphics(path, size, colorkey))
+
+
+def cut_graphics(path, size, colorkey=None):
+	# tiles are subsurfaces of the converted tileset; the registry folds the colorkey into them
+	surface = import_image(path)
 	tile_num_x = surface.get_width() // size[0]
 	tile_num_y = surface.get_height() // size[1]
 	graphics = []
@@ -25,24 +152,124 @@ def import_cut_graphics(path, size):
 		for col in range(tile_num_x):
 			x = col * size[0]
 			y = row * size[1]
-			new_surface = pg.Surface(size, flags=pg.SRCALPHA)
-			new_surface.blit(surface, (0, 0), pg.Rect(x, y, *size))
-			graphics.append(new_surface)
+			tile = surface.subsurface(pg.Rect(x, y, *size))
+			tile.set_colorkey(colorkey)
+			graphics.append(tile)
 
 	return graphics
 
 
 def import_folder(path):
 	# takes all images from the folder[path] and puts them on pg.surface; returns a list of these surfaces
-	surfaces = []
+	return registry.get(('folder', path), lambda: load_folder(path))
 
+
+def load_folder(path):
+	surfaces = atlas_frames(path)
+	if surfaces is not None:
+		return surfaces
+
+	return [import_image(full_path) for full_path in folder_files(path)]
+
+
+def folder_files(path):
+	# image files of the folder in the order import_folder loads them
+	files = []
 	for _, __, img_files in walk(path):
 		for img_file in img_files:
-			full_path = path + img_file
-			image = pg.image.load(full_path).convert_alpha()
-			surfaces.append(image)
+			files.append(path + img_file)
+
+	return files
+
+
+def import_image(path, alpha=True):
+	# serves the image from the texture atlas if it was packed there, otherwise decodes the file
+	frames = atlas_frames(path)
+	if frames is not None:
+		return frames[0]
+
+	return registry.load_image(path, alpha)
+
+
+def load_atlas(path):
+	# reads the frame index; returns {asset path: [(page path, rect, pivot, duration), ...]}
+	if not exists(path):
+		return {}
+
+	with open(path, 'rb') as index_file:
+		data = index_file.read()
+
+	magic, version, page_count, entry_count = atlas_header.unpack_from(data, 0)
+	if magic != atlas_magic or version != atlas_version:
+		raise ValueError(f'{path} is not a version {atlas_version} atlas index')
+	offset = atlas_header.size
+
+	def read_string():
+		nonlocal offset
+		length = int.from_bytes(data[offset:offset + 2], 'little')
+		string = data[offset + 2:offset + 2 + length].decode('utf-8')
+		offset += 2 + length
+		return string
+
+	pages = [join(dirname(path), read_string()) for _ in range(page_count)]
+	index = {}
+	for _ in range(entry_count):
+		key = read_string()
+		frame_count = int.from_bytes(data[offset:offset + 2], 'little')
+		offset += 2
+		frames = []
+		for _ in range(frame_count):
+			page, x, y, width, height, pivot_x, pivot_y, duration = atlas_frame.unpack_from(data, offset)
+			offset += atlas_frame.size
+			frames.append((pages[page], pg.Rect(x, y, width, height), (pivot_x, pivot_y), duration))
+		index[key] = frames
+
+	# like the compiled level, the atlas is only used while it is newer than what was packed into it; a source
+	# edited (or a file added to a packed folder) since then makes the whole atlas stale
+	if atlas_stale(path, pages, index):
+		print(f'{path} is older than its source images, loading them one by one until it is packed again')
+		return {}
+
+	return index
+
+
+def atlas_stale(index_path, pages, index):
+	if not all(exists(page) for page in pages):
+		return True
+	built = min(getmtime(path) for path in (index_path, *pages))
+	sources = []
+	for key in index:
+		sources.extend([key, *folder_files(key)] if key.endswith('/') else [key])
+	return any(getmtime(source) > built for source in sources if exists(source))
+
+
+def atlas_frames(path):
+	# frames packed for an image or folder path as subsurfaces of the atlas pages; None if it wasn't packed
+	if not atlas_graphics:
+		return None
+
+	index_path = atlas_graphics['index']
+	index = registry.get(('atlas', index_path), lambda: load_atlas(index_path))
+	if path not in index:
+		return None
+
+	return [registry.image(page).subsurface(rect) for page, rect, pivot, duration in index[path]]
+
+
+def flip_frames(frames, scale=None, colorkey=None):
+	# bakes frames for both facing directions; returns (right, left) lists of display-format surfaces
+	right_frames, left_frames = [], []
+	for frame in frames:
+		for flip, baked in ((False, right_frames), (True, left_frames)):
+			image = pg.transform.flip(frame, flip, False)
+			if scale:
+				image = pg.transform.scale(image, scale)
+			image = image.convert_alpha()
+			if colorkey is not None:
+				image.set_colorkey(colorkey)
+			baked.append(image)
 
-	return surfaces
+	return right_frames, left_frames
 
 # def import_button_folder(path):
 # 	buttons = {}
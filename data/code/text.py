@@ -0,0 +1,72 @@
+import pygame as pg
+from collections import OrderedDict
+from assets import check_surface
+from config import text_cache_size
+
+number_characters = '0123456789+-'
+
+
+class GlyphAtlas:
+	def __init__(self, font, color, antialias=True, characters=number_characters):
+		# every character is rendered once into one sheet; strings of them are drawn with a single blits call
+		glyphs = [font.render(char, antialias, color) for char in characters]
+		self.height = max(glyph.get_height() for glyph in glyphs)
+		self.sheet = pg.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), flags=pg.SRCALPHA)
+
+		self.areas = {}
+		x = 0
+		for char, glyph in zip(characters, glyphs):
+			self.sheet.blit(glyph, (x, 0), special_flags=pg.BLEND_RGBA_MAX)  # exact copy, alpha included
+			self.areas[char] = pg.Rect(x, 0, glyph.get_width(), self.height)
+			x += glyph.get_width()
+
+	def size(self, text):
+		return sum(self.areas[char].width for char in text), self.height
+
+	def draw(self, surface, text, pos):
+		# draws text at pos (topleft); every character of it has to be in the atlas
+		check_surface(self.sheet, 'glyph atlas')
+		x, y = pos
+		sequence = []
+		for char in text:
+			area = self.areas[char]
+			sequence.append((self.sheet, (x, y), area))
+			x += area.width
+		surface.blits(sequence, doreturn=False)
+		return pg.Rect(pos, (x - pos[0], self.height))
+
+
+class TextCache:
+	def __init__(self, max_entries=text_cache_size):
+		# rendered surfaces are shared: callers that change one (set_alpha, blit onto it) must copy it first
+		self.max_entries = max_entries
+		self.surfaces = OrderedDict()  # (font, text, color, antialias): surface, least recently used first
+		self.atlases = {}
+		self.hits = 0
+		self.misses = 0
+
+	def render(self, font, text, color, antialias=True):
+		key = (font, text, tuple(pg.Color(color)), antialias)
+		surface = self.surfaces.get(key)
+		if surface is not None:
+			self.hits += 1
+			self.surfaces.move_to_end(key)
+			return surface
+
+		self.misses += 1
+		surface = font.render(text, antialias, color)
+		self.surfaces[key] = surface
+		if len(self.surfaces) > self.max_entries:
+			self.surfaces.popitem(last=False)
+		return surface
+
+	def atlas(self, font, color, antialias=True, characters=number_characters):
+		# glyph atlas for text that changes often, like counters and the fps readout
+		key = (font, tuple(pg.Color(color)), antialias, characters)
+		if key not in self.atlases:
+			self.atlases[key] = GlyphAtlas(font, color, antialias, characters)
+		return self.atlases[key]
+
+
+# all ui text is rendered through this cache
+text_cache = TextCache()
@@ -0,0 +1,60 @@
+import pygame as pg
+from config import level_chunk_size
+
+
+class TileMap:
+	def __init__(self, tiles, tile_size, origin, parallax=1, chunk_size=level_chunk_size):
+		# tiles are the sprites of one static layer in world coordinates; they are pre-rendered into chunk
+		# surfaces here and afterwards only used for collision. origin is the world position of cell (0, 0)
+		self.tile_size = tile_size
+		self.origin = origin
+		self.parallax = parallax  # the layer moves with the camera offset * parallax, like the tiles' parallax_index
+		self.chunk_size = chunk_size
+
+		self.cells = {}  # (col, row): tile sprite
+		for tile in tiles:
+			col = int(tile.spawn_pos.x - origin[0]) // tile_size[0]
+			row = int(tile.spawn_pos.y - origin[1]) // tile_size[1]
+			self.cells[col, row] = tile
+
+		self.chunks = self.render_chunks()  # [(surface, world rect)]
+		self.area = self.chunks[0][1].unionall([rect for chunk, rect in self.chunks])  # world rect of the layer
+
+	def render_chunks(self):
+		by_chunk = {}
+		for (col, row), tile in self.cells.items():
+			by_chunk.setdefault((col // self.chunk_size[0], row // self.chunk_size[1]), []).append(tile)
+
+		chunks = []
+		for tiles in by_chunk.values():
+			rect = tiles[0].image.get_rect(topleft=tiles[0].spawn_pos)
+			rect.unionall_ip([tile.image.get_rect(topleft=tile.spawn_pos) for tile in tiles])
+			# static tiles are keyed on white and their alpha is all or nothing, so a white opaque surface
+			# keyed on white looks the same and blits much faster with rle
+			surface = pg.Surface(rect.size).convert()
+			surface.fill('white')
+			surface.blits([(tile.image, tile.spawn_pos - pg.Vector2(rect.topleft)) for tile in tiles], doreturn=False)
+			surface.set_colorkey('white', pg.RLEACCEL)
+			chunks.append((surface, rect))
+
+		return chunks
+
+	def draw(self, queue, layer, offset):
+		# offset is the camera offset for this layer's parallax; only the chunks that overlap the screen are submitted
+		x, y = offset
+		view = queue.view.move(-x, -y)
+		queue.submit_many(layer, [(chunk, (rect.x + x, rect.y + y)) for chunk, rect in self.chunks if rect.colliderect(view)])
+
+	def tiles_at(self, rect):
+		# tile sprites in the cells around a world rect, in row-major order like the sprite group
+		width, height = self.tile_size
+		x, y = self.origin
+		left = (rect.left - x) // width - 1
+		right = (rect.right - x) // width + 1
+		top = (rect.top - y) // height - 1
+		bottom = (rect.bottom - y) // height + 1
+		cells = self.cells
+		return [
+			cells[col, row]
+			for row in range(top, bottom + 1) for col in range(left, right + 1) if (col, row) in cells
+		]
@@ -1,31 +1,27 @@
 import pygame as pg
 from sprite_sheet import SpriteSheet
-from game_data import spritesheet_animations, audio_paths
+from game_data import spritesheet_animations
+from audio import sound_bank
 
 
 # region parent classes
 class Tile(pg.sprite.Sprite):
+	parallax_index = 1  # how fast the tile moves with the camera
+
 	def __init__(self, pos, size):
 		super().__init__()
 		self.image = pg.Surface(size)
 		self.image.set_colorkey('white')
 		self.rect = self.image.get_rect(topleft=pos)
 		self.old_rect = self.rect.copy()
-		self.pos = pg.math.Vector2(self.rect.topleft)
-
-	def update(self, shift):
-		# scroll the tile
-		self.old_rect = self.rect.copy()
-		self.pos.x += shift[0]
-		self.pos.y += shift[1]
-		self.rect.topleft = self.pos
+		self.pos = pg.math.Vector2(self.rect.topleft)  # world position, the camera offset is added when drawing
+		self.spawn_pos = self.pos.copy()
 
 
 class StaticTile(Tile):
 	def __init__(self, pos, size, surface):
 		super().__init__(pos, size)
 		self.image = surface
-		self.image.set_colorkey('white')
 
 
 class AnimatedTile(Tile):
@@ -37,6 +33,7 @@ class AnimatedTile(Tile):
 		self.image = self.frames[self.frame_index]
 		self.animation_speed = 9
 		self.bg_color = bg_color
+		self.cull_animation = True  # the animation may pause while the tile is off screen
 
 	def animate(self, dt):
 		self.frame_index += self.animation_speed * dt
@@ -45,12 +42,9 @@ class AnimatedTile(Tile):
 
 		self.image = self.frames[int(self.frame_index)]
 
-	def update(self, shift, dt):
+	def update(self, dt):
+		# the frames got their colorkey when the sprite sheet was registered
 		self.animate(dt)
-		self.image.set_colorkey(self.bg_color)
-		self.pos.x += shift[0]
-		self.pos.y += shift[1]
-		self.rect.topleft = self.pos
 
 
 # endregion
@@ -62,15 +56,7 @@ class Border(Tile):
 
 
 class BackgroundTile(StaticTile):
-	def __init__(self, pos, size, surface):
-		super().__init__(pos, size, surface)
-		self.parallax_index = 0.7
-
-	def update(self, shift):
-		# scroll the tile
-		self.pos.x += shift[0] * self.parallax_index
-		self.pos.y += shift[1] * self.parallax_index
-		self.rect.topleft = self.pos
+	parallax_index = 0.7
 
 
 class Door(AnimatedTile):
@@ -89,8 +75,8 @@ class Door(AnimatedTile):
 		self.entrance_center = (self.rect.centery, self.rect.centery)
 		self.is_opened = False
 
-	def update(self, shift, dt):
-		super().update(shift, dt)
+	def update(self, dt):
+		super().update(dt)
 		# print(int(self.frame_index))
 		if self.is_opened:
 			self.frames = self.open_state_frames.copy()
@@ -101,18 +87,12 @@ class Door(AnimatedTile):
 
 
 class Lava(AnimatedTile):
+	parallax_index = 0.9
+
 	def __init__(self, pos, width, height, scale, path):
 		self.bg_color = 'white'
 		super().__init__(pos, width, height, scale, path, self.bg_color)
 		self.animation_speed = 6
-		self.parallax_index = 0.9
-
-	def update(self, shift, dt):
-		self.animate(dt)
-		self.image.set_colorkey(self.bg_color)
-		self.pos.x += shift[0] * self.parallax_index
-		self.pos.y += shift[1] * self.parallax_index
-		self.rect.topleft = self.pos
 
 
 class Fire(AnimatedTile):
@@ -132,7 +112,6 @@ class Coin(AnimatedTile):
 		self.collected = False
 		self.hitbox = pg.Rect(0, 0, 34, 34)
 		self.bg_color = 'white'
-		self.collect_sound = pg.mixer.Sound(audio_paths['coin']['collect'])
 		super().__init__(pos, width, height, scale, path, self.bg_color)
 		self.animation_speed = 12
 
@@ -145,32 +124,29 @@ class Coin(AnimatedTile):
 
 		self.image = self.frames[int(self.frame_index)]
 
-	def collect(self, sounds_on):
+	def collect(self):
 		self.path = spritesheet_animations['collect']
 		self.frames = SpriteSheet(self.path, *self.size, self.scale, self.bg_color).import_animation_list()
 		self.collected = True
+		self.cull_animation = False  # the collect animation has to finish to remove the coin
 		self.frame_index = 0
 		self.animation_speed = 9
 		self.image = self.frames[self.frame_index]
-		if sounds_on:
-			self.collect_sound.play()
+		sound_bank.play('coin collect')
 
-	def update(self, shift, dt):
-		super().update(shift, dt)
+	def update(self, dt):
+		super().update(dt)
 		self.hitbox.center = self.rect.center
 
 
 class Torch(AnimatedTile):
+	parallax_index = 0.7
+
 	def __init__(self, pos, width, height, scale, path):
 		self.path = path
 		self.size = (width, height)
 		self.bg_color = 'white'
-		self.parallax_index = 0.7
 		super().__init__(pos, width, height, scale, path, self.bg_color)
 
-	def update(self, shift, dt):
-		# scroll the tile
+	def update(self, dt):
 		self.animate(dt)
-		self.pos.x += shift[0] * self.parallax_index
-		self.pos.y += shift[1] * self.parallax_index
-		self.rect.topleft = self.pos
@@ -0,0 +1,133 @@
+import gzip
+import sys
+import zlib
+from array import array
+from base64 import b64decode
+from bisect import bisect_right
+from xml.etree import ElementTree
+
+from config import level_chunk_size
+
+# tiled keeps the flip and rotation flags in the top bits of a gid; the game doesn't flip tiles
+gid_flags = 0xF0000000
+
+
+class Chunk:
+	# a block of one layer; tiles are row-major tileset-local ids, -1 for an empty cell
+	def __init__(self, col, row, width, height, tiles):
+		self.col = col  # top left cell of the chunk in the level
+		self.row = row
+		self.width = width
+		self.height = height
+		self.tiles = tiles
+
+	def cells(self):
+		# (col, row, tile id) of every non-empty cell, in level coordinates
+		for i, value in enumerate(self.tiles):
+			if value != -1:
+				yield self.col + i % self.width, self.row + i // self.width, value
+
+
+class TileLayer:
+	# one layer split into chunks; only chunks with tiles are stored. indexing and iterating it gives
+	# rows of ids like a csv layout, so the level can build from it directly
+	def __init__(self, name, width, height, tiles, chunk_size=level_chunk_size):
+		self.name = name
+		self.width = width
+		self.height = height
+		self.chunk_size = chunk_size
+		self.chunks = {}
+
+		chunk_w, chunk_h = chunk_size
+		for row in range(0, height, chunk_h):
+			for col in range(0, width, chunk_w):
+				w, h = min(chunk_w, width - col), min(chunk_h, height - row)
+				chunk_tiles = array('h')
+				for r in range(row, row + h):
+					chunk_tiles.extend(tiles[r * width + col:r * width + col + w])
+				if any(value != -1 for value in chunk_tiles):
+					self.chunks[col // chunk_w, row // chunk_h] = Chunk(col, row, w, h, chunk_tiles)
+
+	def chunk_at(self, col, row):
+		# chunk holding the cell, None if that part of the layer is empty
+		return self.chunks.get((col // self.chunk_size[0], row // self.chunk_size[1]))
+
+	def cells(self):
+		for chunk in self.chunks.values():
+			yield from chunk.cells()
+
+	def __len__(self):
+		return self.height
+
+	def __getitem__(self, row):
+		# one full row, stitched together from the chunks it crosses
+		if not 0 <= row < self.height:
+			raise IndexError(row)
+		chunk_w, chunk_h = self.chunk_size
+		tiles = array('h')
+		for col in range(0, self.width, chunk_w):
+			chunk = self.chunks.get((col // chunk_w, row // chunk_h))
+			if chunk is None:
+				tiles.extend([-1] * min(chunk_w, self.width - col))
+			else:
+				local_row = row - chunk.row
+				tiles.extend(chunk.tiles[local_row * chunk.width:(local_row + 1) * chunk.width])
+
+		return tiles
+
+	def __iter__(self):
+		for row in range(self.height):
+			yield self[row]
+
+
+def load_tmx(path):
+	# reads every tile layer of a tiled map; returns {layer name: TileLayer} with the same ids as tiled's csv export
+	root = ElementTree.parse(path).getroot()
+	if root.get('infinite') == '1':
+		raise ValueError(f'{path}: infinite maps are not supported')
+
+	firstgids = sorted(int(tileset.get('firstgid')) for tileset in root.iter('tileset'))
+	layers = {}
+	for layer in root.iter('layer'):
+		width, height = int(layer.get('width')), int(layer.get('height'))
+		gids = layer_gids(layer.find('data'))
+		if len(gids) != width * height:
+			raise ValueError(f'{path}: layer {layer.get("name")!r} has {len(gids)} tiles instead of {width * height}')
+		tiles = array('h', (local_id(gid, firstgids) for gid in gids))
+		layers[layer.get('name')] = TileLayer(layer.get('name'), width, height, tiles)
+
+	return layers
+
+
+def layer_gids(data):
+	# global tile ids of a <data> element in any of tiled's encodings
+	encoding = data.get('encoding')
+	if encoding == 'csv':
+		return [int(gid) for gid in data.text.split(',')]
+
+	if encoding == 'base64':
+		raw = b64decode(data.text.strip())
+		compression = data.get('compression')
+		if compression == 'zlib':
+			raw = zlib.decompress(raw)
+		elif compression == 'gzip':
+			raw = gzip.decompress(raw)
+		elif compression:
+			raise ValueError(f'unsupported layer compression {compression!r}')
+		gids = array('I')
+		gids.frombytes(raw)
+		if sys.byteorder != 'little':
+			gids.byteswap()
+		return gids
+
+	# plain xml, one <tile> per cell
+	return [int(tile.get('gid', 0)) for tile in data.iter('tile')]
+
+
+def local_id(gid, firstgids):
+	# -1 for an empty cell, otherwise the index of the tile in its own tileset
+	gid &= ~gid_flags
+	if gid == 0:
+		return -1
+
+	return gid - firstgids[bisect_right(firstgids, gid) - 1]
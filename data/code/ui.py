@@ -1,27 +1,24 @@
 import pygame as pg
 from game_data import png_graphics
 from pygame.math import Vector2
+from support import import_image
+from assets import normalize, check_surface
+from text import text_cache
 
 
 class TextLabel(pg.sprite.Sprite):
 	def __init__(self, text, font, pos):
 		super().__init__()
 		self.text_color = (255, 255, 255)
-		self.text = text
 		self.font = font
-		self.label = font.render(text, True, self.text_color)
-		self.image = pg.Surface(self.label.get_size(), flags=pg.SRCALPHA)
-		self.rect = self.image.get_rect(center=pos)
 		self.pos = Vector2(pos)
-		self.image.blit(self.label, (0, 0))
+		self.update_text(text)
 
 	def update_text(self, text):
-		self.text_color = (255, 255, 255)
+		# the cached surface is used as is, labels never draw onto their image
 		self.text = text
-		self.label = self.font.render(text, True, self.text_color)
-		self.image = pg.Surface(self.label.get_size(), flags=pg.SRCALPHA)
+		self.image = text_cache.render(self.font, text, self.text_color)
 		self.rect = self.image.get_rect(center=self.pos)
-		self.image.blit(self.label, (0, 0))
 
 
 class Indicator:
@@ -31,7 +28,7 @@ class Indicator:
 		elif type == 'down':
 			color = '#ad150a'  # redish
 		self.text = text
-		self.text_surface = font.render(text, True, color)
+		self.text_surface = text_cache.render(font, text, color).copy()  # a copy, its alpha fades
 		self.alpha = 255
 		self.pos = Vector2(pos)
 		self.starting_y = self.pos.y
@@ -53,19 +50,26 @@ class UI:
 		self.font_small = button_font
 
 		# coin
-		self.coin_icon = pg.image.load(png_graphics['coins']).convert_alpha()
-		self.coin_icon = pg.transform.scale(self.coin_icon, (120, 120))
+		self.coin_icon = import_image(png_graphics['coins'])
+		self.coin_icon = normalize(pg.transform.scale(self.coin_icon, (120, 120)), 'black')
 		self.coin_pos = (30, -5)
+		self.counter_pos = (150, 30)
+		self.counter_color = (230, 230, 230)
 
 		# health bar
-		self.health_bar = pg.image.load(png_graphics['healthbar']).convert_alpha()
+		self.health_bar = import_image(png_graphics['healthbar'])
 		self.health_bar = pg.transform.scale(self.health_bar, (228, 89))
 		self.bar_pos = (65, 90)
 		self.bar_max_width = 180
 		self.bar_height = 7
 		self.current_health = current_health
 
-		self.indicators = []
+		# coins and health are composited into one layer that is only redrawn when either of them changes
+		self.layer = None
+		self.layer_rect = pg.Rect(0, 0, 0, 0)
+		self.layer_state = None  # (coins, health) the layer shows
+
+		self.indicators = []  # active ones only, in the order they were created
 
 	def create_indicator(self, pos, gained_health):
 		if gained_health > 0:
@@ -74,30 +78,47 @@ class UI:
 			indicator = Indicator(self.font_small, pos, f'{gained_health}', 'down')
 		self.indicators.append(indicator)
 
-	def display_health(self, health):
-		self.display_surface.blit(self.health_bar, self.bar_pos)  # display the health bar
+	def display_health(self, surface, offset, health):
+		surface.blit(self.health_bar, (self.bar_pos[0] + offset[0], self.bar_pos[1] + offset[1]))  # display the health bar
 		health_ratio = health / 100
 
 		if health_ratio > 1:
 			health_ratio = 1
 
 		current_bar_width = self.bar_max_width * health_ratio
-		health_bar_rect = pg.Rect((105, 130), (current_bar_width, self.bar_height))  # fill up the health bar
-		pg.draw.rect(self.display_surface, (250, 10, 15), health_bar_rect, 0)
-
-	def display_coins(self, coins):
-		self.coin_icon.set_colorkey('black')
-		self.display_surface.blit(self.coin_icon, self.coin_pos)
-
-		coin_counter = self.font_big.render(str(coins), True, (230, 230, 230))  # dislay coin counter
-		self.display_surface.blit(coin_counter, (150, 30))
+		health_bar_rect = pg.Rect((105 + offset[0], 130 + offset[1]), (current_bar_width, self.bar_height))  # fill up the health bar
+		pg.draw.rect(surface, (250, 10, 15), health_bar_rect, 0)
+
+	def display_coins(self, surface, offset, coins):
+		surface.blit(self.coin_icon, (self.coin_pos[0] + offset[0], self.coin_pos[1] + offset[1]))
+
+		counter_pos = (self.counter_pos[0] + offset[0], self.counter_pos[1] + offset[1])
+		text_cache.atlas(self.font_big, self.counter_color).draw(surface, str(coins), counter_pos)  # dislay coin counter
+
+	def redraw_layer(self, coins, health):
+		counter_size = text_cache.atlas(self.font_big, self.counter_color).size(str(coins))
+		rect = self.coin_icon.get_rect(topleft=self.coin_pos)
+		rect.union_ip(self.health_bar.get_rect(topleft=self.bar_pos))
+		rect.union_ip(pg.Rect(self.counter_pos, counter_size))
+		if not self.layer_rect.contains(rect):  # only grows, when the counter gets another digit
+			self.layer_rect = rect
+			self.layer = pg.Surface(rect.size, flags=pg.SRCALPHA)
+
+		self.layer.fill((0, 0, 0, 0))
+		offset = (-self.layer_rect.x, -self.layer_rect.y)
+		self.display_coins(self.layer, offset, coins)
+		self.display_health(self.layer, offset, health)
+		self.layer_state = (coins, health)
 
 	def draw(self, coins, health, dt):
-		for i, indicator in sorted(enumerate(self.indicators), reverse=True):
-			self.display_surface.blit(indicator.text_surface, indicator.pos)
-			indicator.animate_indicator(dt)
-			if not indicator.alive:
-				self.indicators.pop(i)
-
-		self.display_coins(coins)
-		self.display_health(health)
+		if self.indicators:
+			for indicator in self.indicators:
+				check_surface(indicator.text_surface, 'indicator')
+				self.display_surface.blit(indicator.text_surface, indicator.pos)
+				indicator.animate_indicator(dt)
+			self.indicators = [indicator for indicator in self.indicators if indicator.alive]
+
+		if self.layer_state != (coins, health):
+			self.redraw_layer(coins, health)
+		check_surface(self.layer, 'hud')
+		self.display_surface.blit(self.layer, self.layer_rect)
@@ -1,23 +1,28 @@
-from support import import_folder
-from config import player_real_size
+from collections import OrderedDict
+from support import import_folder, flip_frames
+from config import player_real_size, ring_cache_bytes, ring_cache_max_radius, shockwave_antialias
 from game_data import folder_animations
+from assets import registry
 import pygame as pg
+import pygame.gfxdraw
 
 
 class Dust(pg.sprite.Sprite):
-	def __init__(self, pos, type, flip=False):
+	def __init__(self, animations, pos, type, flip=False):
 		super().__init__()
-		self.frame_index = 0
 		self.animation_speed = 20
-		path = folder_animations[type]
-		self.frames = import_folder(path)
-		self.image = self.frames[self.frame_index]
-		self.rect = self.image.get_rect(midbottom=pos)
+		self.animations = animations
+		self.reset(pos, type, flip)
+
+	def reset(self, pos, type, flip=False):
+		# particles are reused by DustPool, so everything the animation changes is set here
+		self.frame_index = 0
 		self.type = type
 		self.flip = flip
-		# (14, 10) x 2.5
-		self.size = 35, 25
-		self.pos = pg.math.Vector2()
+		self.frames = self.animations[type][flip]
+		self.image = self.frames[self.frame_index]
+		self.rect = self.image.get_rect(midbottom=pos)
+		self.pos = pg.math.Vector2(self.rect.midbottom)
 
 	def animate(self, dt):
 		self.frame_index += self.animation_speed * dt
@@ -27,18 +32,14 @@ class Dust(pg.sprite.Sprite):
 			else:  # if type is run
 				self.frame_index = 0  # keeps going
 		else:
-			frame = self.frames[int(self.frame_index)]
-			frame = pg.transform.scale(frame, self.size)
-			frame = pg.transform.flip(frame, self.flip, False).convert_alpha()
-			self.image = frame
+			self.frames = self.animations[self.type][self.flip]
+			self.image = self.frames[int(self.frame_index)]
 			self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
 			self.pos = pg.math.Vector2(self.rect.midbottom)
 
-	def update(self, shift, opt_pos, flip, dt):
+	def update(self, opt_pos, flip, dt):
 		self.animate(dt)
 		self.flip = flip
-		self.pos.x += shift[0]
-		self.pos.y += shift[1]
 		self.rect.midbottom = self.pos
 		if self.type == 'run':
 			self.rect.midbottom = opt_pos
@@ -48,59 +49,117 @@ class Dust(pg.sprite.Sprite):
 				self.rect.x -= player_real_size[0] * 3 / 4
 
 
+class DustPool:
+	def __init__(self, size=(35, 25)):
+		# (14, 10) x 2.5; frames of every particle type are scaled and flipped once
+		self.animations = registry.get(('dust', size), lambda: self.bake_animations(size))
+		self.particles = []
+
+	def bake_animations(self, size):
+		return {type: flip_frames(import_folder(folder_animations[type]), size) for type in ('jump', 'land', 'run')}
+
+	def get(self, pos, type, flip=False):
+		# reuse a particle that is no longer in any group, otherwise grow the pool
+		for particle in self.particles:
+			if not particle.alive():
+				particle.reset(pos, type, flip)
+				return particle
+
+		particle = Dust(self.animations, pos, type, flip)
+		self.particles.append(particle)
+		return particle
+
+
+def draw_ring(surface, center, radius, thickness, color, antialias=False):
+	pg.draw.circle(surface, color, center, radius, thickness)
+	if antialias:
+		pg.gfxdraw.aacircle(surface, *center, radius, color)
+		if thickness < radius:
+			pg.gfxdraw.aacircle(surface, *center, radius - thickness + 1, color)
+
+
+class RingCache:
+	def __init__(self, max_bytes=ring_cache_bytes, max_radius=ring_cache_max_radius):
+		# every shockwave goes through the same radii and thicknesses, so each ring is drawn once and then
+		# only blitted; the least recently used rings are dropped when they take more than max_bytes.
+		# rings wider than max_radius are rare (player death) and cost more to cache than to draw
+		self.max_bytes = max_bytes
+		self.max_radius = max_radius
+		self.rings = OrderedDict()  # (radius, thickness, color, antialias): surface
+		self.bytes = 0
+
+	def get(self, radius, thickness, color, antialias=False):
+		key = (radius, thickness, color, antialias)
+		ring = self.rings.get(key)
+		if ring is not None:
+			self.rings.move_to_end(key)
+			return ring
+
+		ring = self.render(radius, thickness, color, antialias)
+		self.rings[key] = ring
+		self.bytes += ring.get_width() * ring.get_height() * ring.get_bytesize()
+		while self.bytes > self.max_bytes and len(self.rings) > 1:
+			old = self.rings.popitem(last=False)[1]
+			self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+		return ring
+
+	def render(self, radius, thickness, color, antialias):
+		# 2 * radius + 1 wide with the circle centered, so it blits exactly where pg.draw.circle would draw it
+		size = (radius * 2 + 1, radius * 2 + 1)
+		if antialias:
+			# smooth edges need per-pixel alpha
+			ring = pg.Surface(size, pg.SRCALPHA)
+			draw_ring(ring, (radius, radius), radius, thickness, color, antialias)
+			return ring.convert_alpha()
+
+		# the inside of a ring is one long transparent run, which rle skips cheaply
+		key_color = (0, 0, 0) if color[:3] != (0, 0, 0) else (255, 255, 255)
+		ring = pg.Surface(size).convert()
+		ring.fill(key_color)
+		draw_ring(ring, (radius, radius), radius, thickness, color)
+		ring.set_colorkey(key_color, pg.RLEACCEL)
+		return ring
+
+
+# shared by every shockwave
+ring_cache = RingCache()
+
+
 class Shockwave:
-	def __init__(self, pos, radius, delta_radius, delta_thickness, color, display):
+	def __init__(self, pos, radius, delta_radius, delta_thickness, color, display, antialias=shockwave_antialias):
 		self.pos = pg.Vector2(pos)
 		self.radius = radius
 		self.delta_radius = delta_radius
 		self.delta_thickness = delta_thickness
-		self.color = color
+		self.color = tuple(pg.Color(color))
 		self.display = display
+		self.antialias = antialias
 
 		self.thickness = self.radius / 2
 		self.thickness_int = int(self.thickness)
 		self.radius_int = int(self.radius)
 		self.alive = True
 
-	def update(self, shift, dt):
-		pg.draw.circle(self.display, self.color, self.pos, self.radius_int, self.thickness_int)
+	def draw(self, queue, layer, offset):
+		# pos is in world coordinates, offset is the camera offset
+		x, y = int(self.pos.x + offset[0]), int(self.pos.y + offset[1])
+		radius, thickness = self.radius_int, self.thickness_int
+		if radius > ring_cache.max_radius:
+			queue.call(layer, draw_ring, self.display, (x, y), radius, thickness, self.color, self.antialias)
+		else:
+			ring = ring_cache.get(radius, thickness, self.color, self.antialias)
+			queue.submit(layer, ring, (x - radius, y - radius))
 
+	def update(self, dt):
 		self.thickness -= self.delta_thickness
 		self.radius += self.delta_radius * 60 * dt
 		self.thickness_int = int(self.thickness)
 		self.radius_int = int(self.radius)
-		self.pos.x += shift[0]
-		self.pos.y += shift[1]
 
 		if self.thickness <= 1:
 			self.alive = False
 
 
-class Splash:
-	def __init__(self, pos, speed, radius, color, display_surface, gravity=True):
-		self.pos = pg.Vector2(pos)
-		self.speed = pg.Vector2(speed)
-		self.radius = radius
-		self.color = color
-		self.display_surface = display_surface
-		self.WIDTH, self.HEIGHT = display_surface.get_size()
-		self.gravity = gravity
-		self.alive = True
-
-	def update(self, shift, dt):
-		if self.pos.x < self.WIDTH and self.pos.x + 2 * self.radius > 0 and \
-				self.pos.y < self.HEIGHT and self.pos.y + 2 * self.radius > 0:
-			pg.draw.circle(self.display_surface, self.color, [int(self.pos.x), int(self.pos.y)], self.radius)
-		self.pos.x += self.speed.x + shift[0]
-		self.pos.y += self.speed.y + shift[1]
-
-		if self.gravity:
-			self.speed.y += 0.3
-		self.radius -= 0.25
-		if self.radius <= 0:
-			self.alive = False
-
-
 class Transition:
 	def __init__(self, pos, display_surface):
 		self.pos = pg.Vector2(pos)
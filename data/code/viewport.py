@@ -0,0 +1,91 @@
+import pygame as pg
+from config import render_resolution, render_scaling
+
+
+class Viewport:
+	def __init__(self, window, resolution=render_resolution, scaling=render_scaling):
+		# the game draws into surface; with a fixed resolution that is an offscreen surface of that size, which
+		# present scales into the window once per frame. scaling is 'integer' (sharp, whole multiples, the rest
+		# letterboxed) or 'smooth' (fills as much of the window as the aspect ratio allows)
+		self.window = window
+		self.smooth = scaling == 'smooth'
+		if resolution is None or tuple(resolution) == window.get_size():
+			self.surface = window
+			self.rect = window.get_rect()
+			self.target = None
+			return
+
+		self.surface = pg.Surface(resolution).convert()
+		width, height = resolution
+		window_width, window_height = window.get_size()
+		factor = min(window_width / width, window_height / height)
+		if not self.smooth and factor >= 1:
+			factor = int(factor)
+		# whole multiples map every logical rect onto exact window pixels
+		self.exact = factor == int(factor)
+		self.rect = pg.Rect(0, 0, round(width * factor), round(height * factor))
+		self.rect.center = window.get_rect().center
+		# the scaled frame is written straight into this part of the window, there is no extra copy
+		self.target = window.subsurface(self.rect)
+		self.letterboxed = False
+
+	def redraw(self):
+		# the window was exposed or restored: the bars around the image are painted again
+		self.letterboxed = False
+
+	def to_logical(self, pos):
+		# window coordinates, like pg.mouse.get_pos(), to the coordinates the game draws in
+		if self.target is None:
+			return pos
+		width, height = self.surface.get_size()
+		return (
+			int((pos[0] - self.rect.x) * width / self.rect.width),
+			int((pos[1] - self.rect.y) * height / self.rect.height),
+		)
+
+	def to_window(self, rect):
+		# a logical rect to the window rect it ends up in, rounded outwards
+		width, height = self.surface.get_size()
+		scale_x, scale_y = self.rect.width / width, self.rect.height / height
+		left, top = int(rect.left * scale_x), int(rect.top * scale_y)
+		right, bottom = -int(-rect.right * scale_x), -int(-rect.bottom * scale_y)
+		return pg.Rect(self.rect.x + left, self.rect.y + top, right - left, bottom - top)
+
+	def present(self, rects=None):
+		# rects are the logical areas that changed, None means the whole frame
+		if self.target is None:
+			if rects is None:
+				pg.display.flip()
+			else:
+				pg.display.update(rects)
+			return
+
+		if not self.letterboxed:
+			self.window.fill('black')
+			self.letterboxed = True
+			rects = None
+
+		if rects is None:
+			self.scale()
+			pg.display.flip()
+			return
+
+		# only the changed areas are scaled when whole multiples map them exactly; otherwise the frame is scaled
+		# as a whole so the edges match, but still only the changed areas are sent to the display
+		bounds = self.surface.get_rect()
+		rects = [rect.clip(bounds) for rect in rects]
+		rects = [rect for rect in rects if rect.width and rect.height]
+		window_rects = [self.to_window(rect) for rect in rects]
+		if self.exact and not self.smooth:
+			for rect, window_rect in zip(rects, window_rects):
+				area = window_rect.move(-self.rect.x, -self.rect.y)
+				pg.transform.scale(self.surface.subsurface(rect), area.size, self.target.subsurface(area))
+		else:
+			self.scale()
+		pg.display.update(window_rects)
+
+	def scale(self):
+		if self.smooth:
+			pg.transform.smoothscale(self.surface, self.rect.size, self.target)
+		else:
+			pg.transform.scale(self.surface, self.rect.size, self.target)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+import pygame as pg  # noqa: E402
+
+
+def test_atlas_is_ignored_once_a_source_is_newer(monkeypatch, tmp_path):
+	monkeypatch.chdir(root)
+	pg.init()
+	pg.display.set_mode((1, 1))
+	from atlas import build_atlas
+	from support import load_atlas
+
+	index_path = str(tmp_path / 'atlas.idx')
+	build_atlas(index_path)
+	index = load_atlas(index_path)
+	assert index
+
+	# as if a source was edited after packing: the atlas files are moved to before it
+	source = next(key for key in index if not key.endswith('/'))
+	packed = os.stat(source).st_mtime - 10
+	for path in (index_path, *(str(page) for page in tmp_path.glob('*.png'))):
+		os.utime(path, (packed, packed))
+	assert load_atlas(index_path) == {}
+	pg.quit()
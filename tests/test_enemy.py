@@ -0,0 +1,37 @@
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+import pygame as pg  # noqa: E402
+
+
+def test_enemies_turn_around_at_the_borders(monkeypatch):
+	# enemies and borders are both in world coordinates, so a patrol turns exactly at the border
+	# whatever the camera does
+	monkeypatch.chdir(root)
+	pg.init()
+	surface = pg.display.set_mode((1280, 720))
+	from button import Button
+	from level import Level
+
+	level = Level(surface, Button('pause', (100, 100)), 100)
+	borders = level.border_sprites.sprites()
+	enemies = [enemy for enemy in level.enemy_sprites if enemy.name != 'eye']  # eyes fall instead of patrolling
+	turns = 0
+	for frame in range(600):
+		level.camera.scroll(pg.Vector2(frame % 7 - 3, 0))
+		for enemy in enemies:
+			direction = enemy.direction_x
+			enemy.update(borders, 1 / 60)
+			if enemy.direction_x == -direction:
+				turns += 1
+				if enemy.direction_x == -1:
+					assert any(enemy.innerbox.right == border.rect.left for border in borders)
+				else:
+					assert any(enemy.innerbox.left == border.rect.right for border in borders)
+	assert turns
+	pg.quit()
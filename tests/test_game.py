@@ -0,0 +1,44 @@
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+import pygame as pg  # noqa: E402
+
+
+class Keys(dict):
+	def __getitem__(self, key):
+		return self.get(key, False)
+
+
+def test_quit_while_loading(monkeypatch):
+	monkeypatch.chdir(root)
+	pg.init()
+	screen = pg.display.set_mode((1280, 720))
+	from game import Game
+
+	game = Game(screen, 'menu')
+	game.open_level()
+	game.state = 'loading'  # whether or not the build was already done
+	game.quit()
+	# the frame that is still drawn after quitting must not raise the cancelled build
+	game.run(1 / 60, Keys(), False, (0, 0))
+	assert not game.running
+	assert game.level_future is None or game.level_future.done()
+	pg.quit()
+
+
+def test_quit_before_the_first_frame(monkeypatch):
+	monkeypatch.chdir(root)
+	pg.init()
+	screen = pg.display.set_mode((1280, 720))
+	from game import Game
+
+	game = Game(screen, 'menu')
+	game.quit()
+	game.run(1 / 60, Keys(), False, (0, 0))  # the menu doesn't start a build on the shut down loader
+	assert game.level_future is None
+	pg.quit()
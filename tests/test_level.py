@@ -0,0 +1,27 @@
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+import pygame as pg  # noqa: E402
+
+
+def test_restart_keeps_loading_progress_in_range(monkeypatch):
+	# asset paths are relative to the repository root, like when the game is started
+	monkeypatch.chdir(root)
+	pg.init()
+	surface = pg.display.set_mode((1280, 720))
+	from button import Button
+	from level import Level
+
+	reported = []
+	level = Level(surface, Button('pause', (100, 100)), 100, reported.append)
+	assert reported and reported[-1] == 1
+
+	for _ in range(3):
+		level.reset(100)
+	assert all(0 <= progress <= 1 for progress in reported)
+	pg.quit()
@@ -0,0 +1,25 @@
+import os
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+from game_data import csv_graphics  # noqa: E402
+from level_compiler import compile_level  # noqa: E402
+from support import import_compiled_level, import_csv_level  # noqa: E402
+
+
+def test_compiled_level_matches_csv(monkeypatch, tmp_path):
+	monkeypatch.chdir(root)
+	layers, metadata = import_csv_level(csv_graphics)
+	path = str(tmp_path / 'level.bin')
+	compile_level(layers, metadata, path)
+
+	compiled_layers, compiled_metadata = import_compiled_level(path)
+	assert compiled_metadata == metadata
+	assert list(compiled_layers) == list(layers)
+	for name, rows in layers.items():
+		compiled_rows = compiled_layers[name]
+		if sys.byteorder == 'little':
+			assert all(isinstance(row, memoryview) for row in compiled_rows)  # views into the mapped file
+		assert [tuple(row) for row in compiled_rows] == [tuple(row) for row in rows], name
@@ -0,0 +1,66 @@
+import gzip
+import os
+import sys
+import zlib
+from array import array
+from base64 import b64encode
+from xml.etree import ElementTree
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'data', 'code'))
+
+from game_data import csv_graphics, level_graphics  # noqa: E402
+from support import import_csv_level  # noqa: E402
+from tmx import layer_gids, load_tmx  # noqa: E402
+
+
+def encode(data, encoding, compression=None):
+	# rewrites a <data> element in another of tiled's encodings
+	gids = layer_gids(data)
+	data.attrib.clear()
+	data.text = None
+	for tile in list(data):
+		data.remove(tile)
+
+	if encoding == 'csv':
+		data.set('encoding', 'csv')
+		data.text = ','.join(str(gid) for gid in gids)
+	elif encoding == 'base64':
+		raw = array('I', gids)
+		if sys.byteorder != 'little':
+			raw.byteswap()
+		raw = raw.tobytes()
+		if compression == 'zlib':
+			raw = zlib.compress(raw)
+		elif compression == 'gzip':
+			raw = gzip.compress(raw)
+		data.set('encoding', 'base64')
+		if compression:
+			data.set('compression', compression)
+		data.text = b64encode(raw).decode('ascii')
+	else:
+		for gid in gids:
+			ElementTree.SubElement(data, 'tile', {'gid': str(gid)} if gid else {})
+
+
+@pytest.mark.parametrize('encoding, compression', [
+	('csv', None), ('base64', None), ('base64', 'zlib'), ('base64', 'gzip'), ('xml', None),
+])
+def test_every_encoding_gives_the_csv_tile_ids(monkeypatch, tmp_path, encoding, compression):
+	monkeypatch.chdir(root)
+	tree = ElementTree.parse(level_graphics['tmx'])
+	for data in tree.getroot().iter('data'):
+		encode(data, encoding, compression)
+	path = tmp_path / 'level.tmx'
+	tree.write(path)
+
+	layers = load_tmx(str(path))
+	csv_layers, _ = import_csv_level(csv_graphics)
+	assert sorted(layers) == sorted(csv_layers)
+	for name, rows in csv_layers.items():
+		# rows stitched together from the layer's chunks, and the chunks' own cells
+		assert [tuple(row) for row in layers[name]] == [tuple(row) for row in rows], name
+		cells = {(c, r): value for r, row in enumerate(rows) for c, value in enumerate(row) if value != -1}
+		assert dict(((c, r), value) for c, r, value in layers[name].cells()) == cells, name